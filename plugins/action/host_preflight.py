@@ -0,0 +1,60 @@
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+from ansible.plugins.action import ActionBase
+
+DEFAULT_MAX_CLOCK_SKEW = 30  # seconds
+
+
+def clock_skew(started, finished, elapsed, host_time):
+    """
+    Returns the skew of the host clock against the controller and its uncertainty, in seconds. The host read its clock
+    between sending the module and receiving its result, minus the time the checks took.
+    """
+    window_end = max(finished - elapsed, started)
+    uncertainty = (window_end - started) / 2
+    return host_time - (started + uncertainty), uncertainty
+
+
+class ActionModule(ActionBase):
+
+    TRANSFERS_FILES = False
+
+    def run(self, tmp=None, task_vars=None):
+        self._supports_check_mode = True
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        started = time.time()
+        result.update(self._execute_module(
+            module_name='confluent.platform.host_preflight',
+            module_args=self._task.args,
+            task_vars=task_vars
+        ))
+        finished = time.time()
+        if result.get('failed'):
+            return result
+
+        if 'clock' in (self._task.args.get('checks') or ['clock']):
+            skew, uncertainty = clock_skew(started, finished, result['elapsed'], result['time'])
+            max_clock_skew = float(self._task.args.get('max_clock_skew', DEFAULT_MAX_CLOCK_SKEW))
+            ok = abs(skew) - uncertainty <= max_clock_skew
+            msg = 'Clock is {:.1f}s {} the controller, within {:.1f}s'.format(
+                abs(skew), 'ahead of' if skew > 0 else 'behind', uncertainty)
+            if not ok:
+                msg += ', maximum skew is {}s'.format(max_clock_skew)
+                result['failures'].append(msg)
+            result['report']['checks']['clock'] = dict(ok=ok, msg=msg, skew=round(skew, 3))
+
+        if result['failures']:
+            result['failed'] = True
+            result['msg'] = 'Host preflight failed: {}. To skip host validations, set validate_hosts to false.'.format(
+                '; '.join(result['failures']))
+        else:
+            result['msg'] = 'All {} checks passed'.format(len(result['report']['checks']))
+        result['message'] = result['msg']
+        return result
@@ -0,0 +1,136 @@
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+from ansible import constants as C
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.six.moves.urllib.parse import urlsplit
+from ansible.plugins.action import ActionBase
+
+# MDS tokens are valid for an hour unless confluent.metadata.server.token.max.lifetime.ms says otherwise
+DEFAULT_EXPIRES_IN = 3600  # seconds
+
+
+class ActionModule(ActionBase):
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset()  # every other argument is handed to the uri module
+
+    def _cache_path(self, url, username):
+        key = hashlib.sha256('{}|{}'.format(url.rstrip('/'), username).encode('utf-8')).hexdigest()
+        return os.path.join(C.DEFAULT_LOCAL_TMP, 'mds_token_{}.json'.format(key))
+
+    @staticmethod
+    def _read_cache(path, refresh_margin):
+        try:
+            with open(path) as cache_file:
+                cached = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if cached.get('expires_at', 0) - refresh_margin <= time.time():
+            return None
+        return cached
+
+    @staticmethod
+    def _write_cache(path, entry):
+        tmp_path = path + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump(entry, cache_file)
+        os.rename(tmp_path, path)
+
+    def _authenticate(self, url, username, password, validate_certs, task_vars):
+        result = self._execute_module(
+            module_name='ansible.legacy.uri',
+            module_args=dict(
+                url='{}/security/1.0/authenticate'.format(url.rstrip('/')),
+                method='GET',
+                validate_certs=validate_certs,
+                force_basic_auth=True,
+                url_username=username,
+                url_password=password,
+                return_content=True,
+                status_code=200
+            ),
+            task_vars=task_vars
+        )
+        if result.get('failed'):
+            raise AnsibleActionFail('Unable to authenticate against MDS: {}'.format(result.get('msg')))
+
+        response = result.get('json') or {}
+        if not response.get('auth_token'):
+            raise AnsibleActionFail('MDS authenticate response does not contain an auth_token')
+
+        return {
+            'token': response['auth_token'],
+            'expires_at': int(time.time()) + int(response.get('expires_in') or DEFAULT_EXPIRES_IN)
+        }
+
+    def _get_token(self, url, username, password, validate_certs, refresh_margin, task_vars, stale_token=None):
+        path = self._cache_path(url, username)
+        # Forks hold the lock while authenticating so only the first one calls MDS
+        with open(path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                entry = self._read_cache(path, refresh_margin)
+                # A token MDS rejected is replaced, unless another fork already did it
+                cached = entry is not None and entry['token'] != stale_token
+                if not cached:
+                    entry = self._authenticate(url, username, password, validate_certs, task_vars)
+                    self._write_cache(path, entry)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return entry, cached
+
+    def _request(self, module_args, token, task_vars):
+        headers = dict(module_args.get('headers') or {})
+        headers['Authorization'] = 'Bearer {}'.format(token)
+        return self._execute_module(
+            module_name='ansible.legacy.uri',
+            module_args=dict(module_args, headers=headers),
+            task_vars=task_vars
+        )
+
+    def run(self, tmp=None, task_vars=None):
+        self._supports_check_mode = True
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        module_args = dict(self._task.args)
+        username = module_args.pop('url_username', None)
+        password = module_args.pop('url_password', None)
+        refresh_margin = int(module_args.pop('refresh_margin', 300))
+        module_args.pop('force_basic_auth', None)
+        url = module_args.get('url')
+
+        if not url or not username or password is None:
+            raise AnsibleActionFail('url, url_username and url_password are required')
+
+        if self._task.check_mode:
+            result.update(skipped=True, changed=False, msg='MDS is not called in check mode')
+            return result
+
+        # The token is read again on every attempt of an until loop, so long retries never outlive it
+        parts = urlsplit(url)
+        mds_url = '{}://{}'.format(parts.scheme, parts.netloc)
+        validate_certs = module_args.get('validate_certs', True)
+        try:
+            entry = self._get_token(mds_url, username, password, validate_certs, refresh_margin, task_vars)[0]
+            response = self._request(module_args, entry['token'], task_vars)
+            if response.get('status') == 401:
+                entry = self._get_token(mds_url, username, password, validate_certs, refresh_margin, task_vars,
+                                        stale_token=entry['token'])[0]
+                response = self._request(module_args, entry['token'], task_vars)
+        except AnsibleActionFail as e:
+            # Keeps status defined for the until conditions of the calling tasks
+            response = dict(failed=True, status=-1, msg=str(e))
+
+        result.update(response)
+        return result
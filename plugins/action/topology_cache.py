@@ -0,0 +1,181 @@
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from ansible.errors import AnsibleActionFail, AnsibleError
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.module_utils.common.text.converters import to_native
+from ansible.plugins.action import ActionBase
+
+# plugins/action/topology_cache.py -> collection root
+COLLECTION_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Files whose content shapes the compiled variables, besides the inventory
+COLLECTION_FILES = (
+    'MANIFEST.json',
+    'galaxy.yml',
+    'roles/variables/defaults/main.yml',
+    'roles/variables/vars/main.yml',
+    'plugins/filter/filters.py',
+)
+# Facts the variables role templates into the derived variables, ex. systemd_base_dir
+KEY_FACTS = ('os_family', 'distribution', 'distribution_major_version', 'distribution_release')
+# Variables every host gets from Ansible itself rather than from the inventory, some change on every run
+MAGIC_VARIABLES = frozenset((
+    'omit', 'groups', 'group_names', 'hostvars', 'inventory_hostname', 'inventory_hostname_short', 'inventory_dir',
+    'inventory_file', 'playbook_dir', 'play_hosts', 'role_names', 'environment', 'vars', 'module_setup', 'gather_subset',
+    'ansible_facts', 'ansible_version', 'ansible_check_mode', 'ansible_diff_mode', 'ansible_forks', 'ansible_verbosity',
+    'ansible_run_tags', 'ansible_skip_tags', 'ansible_limit', 'ansible_inventory_sources', 'ansible_config_file',
+    'ansible_playbook_python', 'ansible_search_path', 'ansible_play_hosts', 'ansible_play_hosts_all', 'ansible_play_batch',
+    'ansible_play_name', 'ansible_play_role_names', 'ansible_role_names', 'ansible_dependent_role_names',
+))
+# Cache entries of older inventory revisions are dropped after a week
+MAX_ENTRY_AGE = 7 * 24 * 3600  # seconds
+
+
+def canonical(value):
+    # json.dumps(sort_keys=True) cannot order dicts mixing key types, ex. int and str keys of a yaml mapping
+    if isinstance(value, Mapping):
+        return sorted([str(key), canonical(item)] for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [canonical(item) for item in value]
+    return value
+
+
+def inventory_variables(host_vars):
+    """
+    Variables of a host set by the inventory, its group_vars/host_vars and the extra vars, from the raw variables of
+    the host. Gathered facts and the magic variables Ansible adds are left out.
+    """
+    facts = set(host_vars.get('ansible_facts') or ())
+    facts.update('ansible_' + name for name in list(facts))
+    return dict(
+        (name, value) for name, value in host_vars.items()
+        if name not in MAGIC_VARIABLES and name not in facts
+    )
+
+
+class ActionModule(ActionBase):
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(('cache_dir', 'variables', 'cache_key', 'facts'))
+
+    @staticmethod
+    def _hash_path(digest, path):
+        # Hashes a file, or every file below a directory, in a stable order
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(root, name)
+                for root, dirs, names in os.walk(path)
+                for name in names
+            )
+        elif os.path.isfile(path):
+            files = [path]
+        else:
+            return
+        for file_path in files:
+            digest.update(file_path.encode('utf-8'))
+            with open(file_path, 'rb') as content:
+                digest.update(content.read())
+
+    @staticmethod
+    def _hash_inventory(digest, task_vars, facts):
+        # Group membership, then the inventory variables and the facts of every host, as the variable manager sees them,
+        # so hosts and variables yielded by inventory plugins, scripts and vars plugins count and not the source files
+        groups = task_vars['groups']
+        digest.update(json.dumps(canonical(groups), default=str).encode('utf-8'))
+        for host in sorted(groups.get('all', [])):
+            host_vars = task_vars['hostvars'].raw_get(host)
+            host_facts = host_vars.get('ansible_facts') or {}
+            digest.update(json.dumps([
+                host,
+                canonical(inventory_variables(host_vars)),
+                [host_facts.get(name) for name in facts]
+            ], default=str).encode('utf-8'))
+
+    def _cache_key(self, task_vars, facts):
+        digest = hashlib.sha256()
+        self._hash_inventory(digest, task_vars, facts)
+
+        # Collection version and the role/filter code that computes the variables
+        for name in COLLECTION_FILES:
+            self._hash_path(digest, os.path.join(COLLECTION_ROOT, name))
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _prune(cache_dir, key):
+        now = time.time()
+        for entry in glob.glob(os.path.join(cache_dir, '*')):
+            if os.path.basename(entry) != key and now - os.path.getmtime(entry) > MAX_ENTRY_AGE:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _compile(self, variables, task_vars):
+        compiled = {}
+        errors = []
+        for name in variables:
+            if name not in task_vars:
+                errors.append('{} is undefined'.format(name))
+                continue
+            try:
+                value = self._templar.template(task_vars[name])
+                # Round trip through json so only plain data ends up in the cache and in the facts
+                compiled[name] = json.loads(json.dumps(value))
+            except (AnsibleError, TypeError, ValueError) as e:
+                errors.append('{}: {}'.format(name, to_native(e)))
+        return compiled, errors
+
+    def run(self, tmp=None, task_vars=None):
+        self._supports_check_mode = True
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        cache_dir = self._task.args.get('cache_dir')
+        variables = self._task.args.get('variables') or []
+        if not cache_dir:
+            raise AnsibleActionFail('cache_dir is required')
+
+        # Computing the key reads the variables of every host, run it once with no variables and pass the key on
+        key = self._task.args.get('cache_key') or self._cache_key(task_vars, self._task.args.get('facts') or KEY_FACTS)
+        result.update(changed=False, cache_key=key)
+        if not variables:
+            result.update(cached=False, variables={})
+            return result
+
+        cache_dir = os.path.expanduser(cache_dir)
+        path = os.path.join(cache_dir, key, '{}.json'.format(task_vars['inventory_hostname']))
+
+        compiled = None
+        if os.path.isfile(path):
+            with open(path) as cache_file:
+                compiled = json.load(cache_file)
+            # The list of variables may have been customized since the entry was written
+            if not set(variables).issubset(compiled['requested']):
+                compiled = None
+
+        cached = compiled is not None
+        if not cached:
+            compiled_variables, errors = self._compile(variables, task_vars)
+            if errors:
+                raise AnsibleActionFail('Unable to compile the topology variables: {}'.format('; '.join(errors)))
+            compiled = {'requested': sorted(variables), 'variables': compiled_variables}
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(compiled, cache_file)
+            os.rename(tmp_path, path)
+            self._prune(cache_dir, key)
+
+        result.update(
+            cached=cached,
+            variables=dict((name, value) for name, value in compiled['variables'].items() if name in variables)
+        )
+        return result
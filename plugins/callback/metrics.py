@@ -0,0 +1,294 @@
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+    name: metrics
+    type: aggregate
+    short_description: Records per host call counts, latencies, bytes and retries and the critical path of a run
+    description:
+        - Records, for each host, the time spent in Connect/MDS REST calls, in JVM and CLI shell-outs and in every task,
+          along with call counts, bytes transferred and retries.
+        - Filters from confluent.platform are timed on the controller and reported under the host they were templated
+          for, or under the C(controller) host when templated outside of a host.
+        - Computes the critical path of every play, batch by batch when the play uses C(serial).
+        - Writes the report as JSON or as a Prometheus textfile when the playbook ends.
+    requirements:
+        - enable in configuration, ex. C(callbacks_enabled=profile_tasks,confluent.platform.metrics)
+    options:
+        output_format:
+            description: Format of the report, C(json) or C(prometheus) textfile.
+            default: json
+            choices: ['json', 'prometheus']
+            type: str
+            env:
+                - name: CONFLUENT_METRICS_FORMAT
+            ini:
+                - section: callback_confluent_metrics
+                  key: output_format
+        output_path:
+            description: File the report is written to, defaults to confluent_metrics.json or confluent_metrics.prom in the current directory.
+            type: path
+            env:
+                - name: CONFLUENT_METRICS_OUTPUT
+            ini:
+                - section: callback_confluent_metrics
+                  key: output_path
+        commands:
+            description: Executables whose invocations through command/shell tasks are recorded as shell-outs.
+            type: list
+            elements: str
+            default: ['kafka-topics', 'kafka-configs', 'kafka-acls', 'kafka-storage', 'kafka-metadata-quorum', 'zookeeper-shell',
+                      'keytool', 'openssl', 'confluent-hub', 'confluent']
+            env:
+                - name: CONFLUENT_METRICS_COMMANDS
+            ini:
+                - section: callback_confluent_metrics
+                  key: commands
+        summary_size:
+            description: Number of critical path tasks printed at the end of the run.
+            type: int
+            default: 10
+            env:
+                - name: CONFLUENT_METRICS_SUMMARY_SIZE
+            ini:
+                - section: callback_confluent_metrics
+                  key: summary_size
+'''
+
+import json
+import os
+import shlex
+import shutil
+import tempfile
+import time
+
+from ansible.plugins.callback import CallbackBase
+from ansible_collections.confluent.platform.plugins.module_utils.metrics import Metrics, SPOOL_DIR_ENV, read_spool
+
+HTTP_ACTIONS = ('uri', 'kafka_connectors')
+COMMAND_ACTIONS = ('command', 'shell')
+
+
+class CallbackModule(CallbackBase):
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'confluent.platform.metrics'
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self.host_metrics = {}
+        self.plays = []
+        self.current_play = None
+        self.current_task = None
+        self.host_starts = {}
+
+        # Exported before the strategy forks any worker so filters can spool their timings
+        self.spool_dir = tempfile.mkdtemp(prefix='confluent-metrics-')
+        os.environ[SPOOL_DIR_ENV] = self.spool_dir
+
+    def _metrics(self, host):
+        if host not in self.host_metrics:
+            self.host_metrics[host] = Metrics()
+        return self.host_metrics[host]
+
+    def v2_playbook_on_play_start(self, play):
+        # The start of a play is sent again for every serial batch
+        if self.current_play is None or self.current_play['uuid'] != play._uuid:
+            self.current_play = {'uuid': play._uuid, 'name': play.get_name().strip(), 'batches': []}
+            self.plays.append(self.current_play)
+        self.current_play['batches'].append([])
+
+    def _start_task(self, task):
+        if self.current_play is None:
+            return
+        self.current_task = {'name': task.get_name().strip(), 'durations': {}}
+        self.current_play['batches'][-1].append(self.current_task)
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        self._start_task(task)
+
+    def v2_playbook_on_handler_task_start(self, task):
+        self._start_task(task)
+
+    def v2_runner_on_start(self, host, task):
+        self.host_starts[(host.get_name(), task._uuid)] = time.time()
+
+    def _record_result(self, result):
+        host = result._host.get_name()
+        task = result._task
+        start = self.host_starts.pop((host, task._uuid), None)
+        elapsed = time.time() - start if start is not None else 0.0
+        if self.current_task is not None:
+            self.current_task['durations'][host] = elapsed
+
+        action = task.action.split('.')[-1]
+        host_metrics = self._metrics(host)
+        task_result = result._result
+        host_metrics.record('task', task.get_name().strip(), elapsed, retries=max(task_result.get('attempts', 1) - 1, 0))
+
+        for item_result in task_result.get('results', [task_result]):
+            if not isinstance(item_result, dict):
+                continue
+            if action in HTTP_ACTIONS and isinstance(item_result.get('metrics'), dict):
+                host_metrics.merge(item_result['metrics'])
+            elif action == 'uri' and 'url' in item_result:
+                host_metrics.record(
+                    'http',
+                    '{} {}'.format(task.args.get('method', 'GET'), item_result['url'].split('?', 1)[0]),
+                    item_result.get('elapsed', 0),
+                    bytes_sent=len(str(task.args.get('body') or '')),
+                    # content_length is the header, missing on chunked responses
+                    bytes_received=len(item_result['content']) if 'content' in item_result else int(item_result.get('content_length') or 0),
+                    retries=max(item_result.get('attempts', 1) - 1, 0)
+                )
+            elif action in COMMAND_ACTIONS and item_result.get('cmd'):
+                self._record_commands(host_metrics, item_result)
+
+    def _record_commands(self, host_metrics, item_result):
+        cmd = item_result['cmd']
+        if isinstance(cmd, list):
+            words = cmd
+        else:
+            try:
+                words = shlex.split(cmd)
+            except ValueError:
+                words = cmd.split()
+        names = set(os.path.basename(word) for word in words)
+        commands = [command for command in self.get_option('commands') if command in names]
+        if commands:
+            host_metrics.record(
+                'command',
+                ','.join(commands),
+                self._delta_seconds(item_result.get('delta')),
+                bytes_received=len(item_result.get('stdout') or '')
+            )
+
+    @staticmethod
+    def _delta_seconds(delta):
+        # command/shell report their runtime as H:MM:SS.ffffff
+        try:
+            hours, minutes, seconds = delta.split(':')
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        except (AttributeError, ValueError):
+            return 0.0
+
+    def v2_runner_on_ok(self, result):
+        self._record_result(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record_result(result)
+
+    def v2_runner_on_skipped(self, result):
+        self._record_result(result)
+
+    def v2_runner_on_unreachable(self, result):
+        self._record_result(result)
+
+    def _critical_path(self):
+        # Hosts of a batch run each task in lockstep, so the slowest host of every task is on the critical path
+        plays = []
+        for play in self.plays:
+            batches = []
+            for index, batch in enumerate(play['batches']):
+                tasks = []
+                for task in batch:
+                    if not task['durations']:
+                        continue
+                    host = max(task['durations'], key=task['durations'].get)
+                    tasks.append({'task': task['name'], 'host': host, 'seconds': task['durations'][host]})
+                batches.append({
+                    'batch': index + 1,
+                    'hosts': sorted(set(host for task in batch for host in task['durations'])),
+                    'total_seconds': sum(task['seconds'] for task in tasks),
+                    'tasks': tasks
+                })
+            plays.append({
+                'name': play['name'],
+                'total_seconds': sum(batch['total_seconds'] for batch in batches),
+                'batches': batches
+            })
+        return {'total_seconds': sum(play['total_seconds'] for play in plays), 'plays': plays}
+
+    def _report(self):
+        filter_metrics, unflushed_workers = read_spool(self.spool_dir)
+        for host, metrics in filter_metrics.items():
+            self._metrics(host).merge(metrics.as_dict())
+        return {
+            'hosts': dict((host, metrics.as_dict()) for host, metrics in self.host_metrics.items()),
+            'critical_path': self._critical_path(),
+            # workers flush their filter timings when they exit, those still running are missing from the report
+            'unflushed_workers': unflushed_workers
+        }
+
+    @staticmethod
+    def _label(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def _prometheus(self, report):
+        series = [
+            ('calls', 'calls_total', 'counter', 'Number of calls'),
+            ('total_seconds', 'call_seconds_total', 'counter', 'Total time spent in calls'),
+            ('max_seconds', 'call_seconds_max', 'gauge', 'Slowest call'),
+            ('bytes_sent', 'bytes_sent_total', 'counter', 'Bytes sent'),
+            ('bytes_received', 'bytes_received_total', 'counter', 'Bytes received'),
+            ('retries', 'retries_total', 'counter', 'Retries'),
+        ]
+        lines = []
+        for key, metric, metric_type, help_text in series:
+            lines.append('# HELP confluent_ansible_{} {}'.format(metric, help_text))
+            lines.append('# TYPE confluent_ansible_{} {}'.format(metric, metric_type))
+            for host, categories in sorted(report['hosts'].items()):
+                for category, names in sorted(categories.items()):
+                    for name, values in sorted(names.items()):
+                        lines.append('confluent_ansible_{}{{host="{}",category="{}",name="{}"}} {}'.format(
+                            metric, self._label(host), self._label(category), self._label(name), values[key]))
+
+        lines.append('# HELP confluent_ansible_unflushed_workers Workers whose filter timings are missing from the report')
+        lines.append('# TYPE confluent_ansible_unflushed_workers gauge')
+        lines.append('confluent_ansible_unflushed_workers {}'.format(report['unflushed_workers']))
+
+        lines.append('# HELP confluent_ansible_critical_path_seconds Critical path of each play batch')
+        lines.append('# TYPE confluent_ansible_critical_path_seconds gauge')
+        for play in report['critical_path']['plays']:
+            for batch in play['batches']:
+                lines.append('confluent_ansible_critical_path_seconds{{play="{}",batch="{}"}} {}'.format(
+                    self._label(play['name']), batch['batch'], batch['total_seconds']))
+        return '\n'.join(lines) + '\n'
+
+    def v2_playbook_on_stats(self, stats):
+        report = self._report()
+        output_format = self.get_option('output_format')
+        output_path = self.get_option('output_path') or \
+            ('confluent_metrics.prom' if output_format == 'prometheus' else 'confluent_metrics.json')
+
+        if output_format == 'prometheus':
+            content = self._prometheus(report)
+        else:
+            content = json.dumps(report, indent=2, sort_keys=True)
+
+        # Written through a rename so textfile collectors never scrape a partial file
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'w') as output:
+            output.write(content)
+        os.rename(tmp_path, output_path)
+
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+        os.environ.pop(SPOOL_DIR_ENV, None)
+
+        critical_tasks = [dict(task, play=play['name'], batch=batch['batch'])
+                          for play in report['critical_path']['plays']
+                          for batch in play['batches']
+                          for task in batch['tasks']]
+        critical_tasks.sort(key=lambda task: task['seconds'], reverse=True)
+
+        self._display.banner('CRITICAL PATH: {:.2f}s'.format(report['critical_path']['total_seconds']))
+        for task in critical_tasks[:self.get_option('summary_size')]:
+            self._display.display('{:<80} {:>10.2f}s  {} (batch {})'.format(
+                task['task'][:80], task['seconds'], task['host'], task['batch']))
+        if report['unflushed_workers']:
+            self._display.warning('Filter timings of {} worker(s) still running at the end of the playbook are missing from the '
+                                  'metrics'.format(report['unflushed_workers']))
+        self._display.display('Metrics written to {}'.format(output_path))
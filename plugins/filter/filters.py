@@ -1,9 +1,12 @@
 import re
 
+from ansible_collections.confluent.platform.plugins.module_utils import connector_definitions
+from ansible_collections.confluent.platform.plugins.module_utils.metrics import instrument
+
 
 class FilterModule(object):
     def filters(self):
-        return {
+        filters = {
             'normalize_sasl_protocol': self.normalize_sasl_protocol,
             'kafka_protocol_normalized': self.kafka_protocol_normalized,
             'kafka_protocol': self.kafka_protocol,
@@ -23,8 +26,12 @@ class FilterModule(object):
             'client_properties': self.client_properties,
             'c3_connect_properties': self.c3_connect_properties,
             'c3_ksql_properties': self.c3_ksql_properties,
-            'resolve_principal': self.resolve_principal
+            'resolve_principal': self.resolve_principal,
+            'listener_peers': self.listener_peers,
+            'connector_names': self.connector_names
         }
+        # Timings are only spooled when the confluent.platform.metrics callback is enabled
+        return dict((name, instrument('filter', name, function)) for name, function in filters.items())
 
     def normalize_sasl_protocol(self, protocol):
         # Returns standardized value for sasl mechanism string
@@ -344,6 +351,44 @@ class FilterModule(object):
 
         return final_dict
 
+    def listener_peers(self, listener_ports, peer_groups, group_names, groups, hostvars, inventory_hostname, quorum_ports=None):
+        # For the host preflight, inputs the listener port variables of each ansible group with their default values,
+        # the groups the hosts of each group connect to, and the port variables only the hosts of the same group
+        # connect to, like the zookeeper quorum ports
+        # Outputs one entry per listener port of the other hosts this host connects to
+        port_vars = {}
+        for group in group_names:
+            for peer_group in peer_groups.get(group, []):
+                port_vars.setdefault(peer_group, {}).update(listener_ports.get(peer_group, {}))
+            if group in (quorum_ports or {}):
+                port_vars.setdefault(group, {}).update(quorum_ports[group])
+
+        peers = []
+        for ansible_group, group_port_vars in port_vars.items():
+            for host in groups.get(ansible_group, []):
+                if host == inventory_hostname:
+                    continue
+                for var_name, default in group_port_vars.items():
+                    value = hostvars[host].get(var_name, default)
+                    # Listener dictionaries like kafka_broker_listeners hold one port per listener
+                    ports = [listener.get('port') for listener in value.values()] if isinstance(value, dict) else [value]
+                    for port in ports:
+                        if port in (None, ''):
+                            continue
+                        peers.append({
+                            'host': host,
+                            'group': ansible_group,
+                            'address': self.resolve_hostname(hostvars[host]),
+                            'port': int(port)
+                        })
+
+        return peers
+
+    def connector_names(self, path):
+        # Inputs an NDJSON file or a directory of connector definitions on the control node
+        # Outputs the names of the connectors, reading one definition at a time
+        return connector_definitions.names(path)
+
     def resolve_principal(self, common_names: str, rules: str):
         """
         This filter is to extract principle from the keystore based on the provided rule. This filter should be
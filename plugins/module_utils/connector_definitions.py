@@ -0,0 +1,74 @@
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+
+# desired states a connector definition may ask for
+CONNECTOR_STATES = ('running', 'paused')
+
+
+class DefinitionError(ValueError):
+    pass
+
+
+def _parse(raw, location):
+    try:
+        definition = json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        raise DefinitionError('{}: invalid connector definition ({})'.format(location, e))
+    validate(definition, location)
+    return definition
+
+
+def validate(definition, location):
+    if not isinstance(definition, dict) or not definition.get('name') or not isinstance(definition.get('config'), dict):
+        raise DefinitionError("{}: each connector must have a 'name' and a 'config' field".format(location))
+    if definition.get('state', 'running') not in CONNECTOR_STATES:
+        raise DefinitionError('{}: state must be one of {}'.format(definition['name'], ', '.join(CONNECTOR_STATES)))
+
+
+def definition_digest(raw):
+    # Digest of a definition as written in connectors_path, compared with the one recorded when it was last deployed
+    return hashlib.sha256(raw.strip()).hexdigest()
+
+
+def scan(path):
+    """
+    Yields (name, digest, location) for each connector definition under path, either an NDJSON file holding one
+    connector per line or a directory holding one connector per .json file.
+    Only one definition is held in memory at a time, load() reads it back from its location when needed.
+    """
+    if os.path.isdir(path):
+        for file_name in sorted(os.listdir(path)):
+            if not file_name.endswith('.json'):
+                continue
+            file_path = os.path.join(path, file_name)
+            with open(file_path, 'rb') as definition_file:
+                raw = definition_file.read()
+            yield _parse(raw, file_path)['name'], definition_digest(raw), (file_path, None)
+        return
+
+    with open(path, 'rb') as definitions_file:
+        offset = 0
+        for line_number, line in enumerate(iter(definitions_file.readline, b''), 1):
+            if line.strip():
+                location = '{}:{}'.format(path, line_number)
+                yield _parse(line, location)['name'], definition_digest(line), (path, offset)
+            offset += len(line)
+
+
+def load(location):
+    file_path, offset = location
+    with open(file_path, 'rb') as definitions_file:
+        if offset is None:
+            return _parse(definitions_file.read(), file_path)
+        definitions_file.seek(offset)
+        return _parse(definitions_file.readline(), file_path)
+
+
+def names(path):
+    return [name for name, _digest, _location in scan(path)]
@@ -0,0 +1,164 @@
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import atexit
+import json
+import os
+import time
+
+try:
+    from multiprocessing.util import Finalize
+except ImportError:
+    Finalize = None
+
+try:
+    from jinja2 import pass_context
+except ImportError:
+    try:
+        from jinja2 import contextfilter as pass_context
+    except ImportError:
+        # Modules import this file on the managed hosts, where jinja2 may be missing
+        pass_context = None
+
+# When the confluent.platform.metrics callback is enabled it exports this variable before any worker is forked,
+# so filters templated in worker processes can append their timings to a spool file the callback reads at the end
+SPOOL_DIR_ENV = 'CONFLUENT_METRICS_SPOOL_DIR'
+
+# Host the timings of filters templated without an inventory_hostname are attributed to
+CONTROLLER_HOST = 'controller'
+
+
+class Metrics(object):
+    """
+    Accumulates call counts, latencies, bytes transferred and retries keyed by category and name.
+    The dict returned by as_dict() is what modules return under their 'metrics' key and what the callback merges.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def _entry(self, category, name):
+        return self.data.setdefault(category, {}).setdefault(name, {
+            'calls': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0,
+            'bytes_sent': 0,
+            'bytes_received': 0,
+            'retries': 0
+        })
+
+    def record(self, category, name, elapsed, bytes_sent=0, bytes_received=0, retries=0):
+        entry = self._entry(category, name)
+        entry['calls'] += 1
+        entry['total_seconds'] += elapsed
+        entry['max_seconds'] = max(entry['max_seconds'], elapsed)
+        entry['bytes_sent'] += bytes_sent
+        entry['bytes_received'] += bytes_received
+        entry['retries'] += retries
+
+    def retry(self, category, name):
+        self._entry(category, name)['retries'] += 1
+
+    def merge(self, other):
+        # other is a dict as produced by as_dict()
+        for category, names in other.items():
+            for name, values in names.items():
+                entry = self._entry(category, name)
+                for key in ('calls', 'total_seconds', 'bytes_sent', 'bytes_received', 'retries'):
+                    entry[key] += values.get(key, 0)
+                entry['max_seconds'] = max(entry['max_seconds'], values.get('max_seconds', 0.0))
+
+    def as_dict(self):
+        return self.data
+
+
+def spool_enabled():
+    return bool(os.environ.get(SPOOL_DIR_ENV))
+
+
+# Timings of the current process, keyed by host, written once when the process exits
+_spool_buffer = {}
+_spool_pid = None
+
+
+def _pending_path(spool_dir, pid):
+    # Exists from the first timing of a process until the process flushed them
+    return os.path.join(spool_dir, '{}.pending'.format(pid))
+
+
+def flush_spool():
+    global _spool_buffer
+    buffered, _spool_buffer = _spool_buffer, {}
+    spool_dir = os.environ.get(SPOOL_DIR_ENV)
+    if not buffered or not spool_dir or not os.path.isdir(spool_dir):
+        return
+    # One file per process so concurrent forks never interleave writes
+    path = os.path.join(spool_dir, '{}.ndjson'.format(os.getpid()))
+    with open(path, 'a') as spool:
+        for host, metrics in buffered.items():
+            spool.write(json.dumps({'host': host, 'metrics': metrics.as_dict()}) + '\n')
+    try:
+        os.remove(_pending_path(spool_dir, os.getpid()))
+    except OSError:
+        pass
+
+
+def spool_record(host, category, name, elapsed):
+    global _spool_buffer, _spool_pid
+    if _spool_pid != os.getpid():
+        # First record of a process, forks start with a copy of their parent's buffer which the parent flushes itself
+        _spool_buffer = {}
+        _spool_pid = os.getpid()
+        open(_pending_path(os.environ[SPOOL_DIR_ENV], _spool_pid), 'a').close()
+        # Workers leave through os._exit, which runs the multiprocessing finalizers but not atexit
+        if Finalize is not None:
+            Finalize(None, flush_spool, exitpriority=10)
+        atexit.register(flush_spool)
+    if host not in _spool_buffer:
+        _spool_buffer[host] = Metrics()
+    _spool_buffer[host].record(category, name, elapsed)
+
+
+def read_spool(spool_dir):
+    """
+    Folds the spooled timings into one Metrics object per host.
+    Returns them with the number of processes that recorded timings but had not flushed them yet, whose timings
+    are missing from the result.
+    """
+    flush_spool()
+    host_metrics = {}
+    unflushed = 0
+    if not os.path.isdir(spool_dir):
+        return host_metrics, unflushed
+    for file_name in os.listdir(spool_dir):
+        if file_name.endswith('.pending'):
+            unflushed += 1
+            continue
+        with open(os.path.join(spool_dir, file_name)) as spool:
+            for line in spool:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                host_metrics.setdefault(record['host'], Metrics()).merge(record['metrics'])
+    return host_metrics, unflushed
+
+
+def instrument(category, name, function):
+    # Wraps a filter so each invocation is timed into the spool under the host being templated, the check is done
+    # per call because plugins may be loaded before the callback exports the spool directory
+    def wrapper(context, *args, **kwargs):
+        if not spool_enabled():
+            return function(*args, **kwargs)
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            spool_record(context.get('inventory_hostname') or CONTROLLER_HOST, category, name, time.time() - start)
+    wrapper.__name__ = getattr(function, '__name__', name)
+    wrapper.__doc__ = getattr(function, '__doc__', None)
+    if pass_context is None:
+        return function
+    return pass_context(wrapper)
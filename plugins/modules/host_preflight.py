@@ -0,0 +1,401 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.91',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: host_preflight
+
+short_description: Runs all host validations in a single execution and returns one report.
+
+version_added: "7.6.1"
+
+description:
+    - "Checks the OS version, the temporary directory, free disk space and memory, resolves the hostnames of the
+    host itself and of its peers and probes the listener ports of the peers, all in one module run."
+    - "Name resolutions and port probes run concurrently, so a host that cannot reach its peers fails within the
+    probe timeout instead of during the health checks of the rollout."
+    - "A refused connection counts as reachable, the peer answered but nothing listens on the port yet, as on a
+    first install. Timeouts and unreachable networks count as failures, they point at firewalls or routing."
+    - "The clock check is done by the action plugin of the same name, which compares the time of the host with the
+    time of the controller around the module run. The action fails when any of the checks failed."
+
+options:
+    checks:
+        type: list
+        elements: str
+        description:
+            - Checks to run
+        required: false
+        choices: ['os', 'tmp', 'disk', 'memory', 'dns', 'ports', 'clock']
+        default: ['os', 'tmp', 'disk', 'memory', 'dns', 'ports', 'clock']
+    supported_os_versions:
+        type: dict
+        description:
+            - Supported major versions of each OS, keyed by RedHat, Ubuntu or Debian. Other OSes are not checked
+        required: false
+        default: {}
+    tmp_path:
+        type: path
+        description:
+            - Directory that must be writable for temporary files
+        required: false
+        default: /tmp
+    disk_paths:
+        type: list
+        elements: path
+        description:
+            - Paths whose filesystem needs required_disk_mb free, the closest existing parent is checked
+        required: false
+        default: ['/']
+    required_disk_mb:
+        type: int
+        description:
+            - Minimum free disk space in MB on each of the disk_paths filesystems
+        required: false
+        default: 0
+    required_memory_mb:
+        type: int
+        description:
+            - Minimum available memory in MB
+        required: false
+        default: 0
+    hostname:
+        type: str
+        description:
+            - Hostname the other hosts use to reach this host, it must resolve
+        required: false
+    require_local_hostname:
+        type: bool
+        description:
+            - Fail the dns check when hostname does not resolve to an address of this host, instead of only warning.
+              NAT, floating and virtual IP addresses are not addresses of the host
+        required: false
+        default: false
+    peers:
+        type: list
+        elements: dict
+        description:
+            - Listener ports to probe, each with an address, a port and optionally the host and group they belong to
+        required: false
+        default: []
+    max_clock_skew:
+        type: float
+        description:
+            - Maximum difference in seconds between the clocks of the host and the controller. Handled by the action
+        required: false
+        default: 30
+    timeout:
+        type: float
+        description:
+            - Seconds to wait for each port probe
+        required: false
+        default: 3
+    workers:
+        type: int
+        description:
+            - Number of name resolutions and port probes run concurrently
+        required: false
+        default: 32
+
+author:
+    - Confluent Inc
+'''
+
+EXAMPLES = '''
+- name: Run Host Preflight Checks
+  confluent.platform.host_preflight:
+    supported_os_versions:
+      RedHat: ['7', '8', '9']
+    required_disk_mb: 1000
+    required_memory_mb: 7000
+    hostname: kafka-broker1
+    peers:
+      - host: zookeeper1
+        group: zookeeper
+        address: zookeeper1
+        port: 2181
+'''
+
+RETURN = '''
+message:
+    description: The output message that the module generates
+    type: str
+    returned: always
+report:
+    description: Result of each check under checks, and the state of each probed port under peers
+    type: dict
+    returned: always
+failures:
+    description: Messages of the checks that failed
+    type: list
+    returned: always
+time:
+    description: Epoch time on the host when the module started
+    type: float
+    returned: always
+elapsed:
+    description: Seconds the checks took on the host
+    type: float
+    returned: always
+'''
+
+import errno
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ansible.module_utils.basic import AnsibleModule
+__metaclass__ = type
+
+CHECKS = ['os', 'tmp', 'disk', 'memory', 'dns', 'ports', 'clock']
+# States of a probed port, a refused connection means the peer is reachable but not listening yet
+REACHABLE_STATES = ('open', 'refused')
+
+
+def read_os_release():
+    release = {}
+    for path in ('/etc/os-release', '/usr/lib/os-release'):
+        if not os.path.isfile(path):
+            continue
+        with open(path) as release_file:
+            for line in release_file:
+                if '=' in line:
+                    key, value = line.rstrip('\n').split('=', 1)
+                    release[key] = value.strip('"\'')
+        break
+    return release
+
+
+def os_family(release):
+    # Same grouping as the ansible_os_family/ansible_distribution conditions of the roles
+    distribution_id = release.get('ID', '')
+    if distribution_id == 'ubuntu':
+        return 'Ubuntu'
+    if distribution_id == 'debian':
+        return 'Debian'
+    ids = [distribution_id] + release.get('ID_LIKE', '').split()
+    if any(name in ('rhel', 'centos', 'fedora') for name in ids):
+        return 'RedHat'
+    return None
+
+
+def check_os(module):
+    release = read_os_release()
+    family = os_family(release)
+    version = release.get('VERSION_ID', '').split('.')[0]
+    supported = module.params['supported_os_versions'].get(family) if family else None
+    if supported is None:
+        return True, 'OS {} {} is not validated'.format(release.get('ID', 'unknown'), version)
+    supported = [str(supported_version) for supported_version in supported]
+    if version in supported:
+        return True, '{} version {} is supported'.format(family, version)
+    return False, '{} version {} not in supported versions: {}'.format(family, version, ', '.join(supported))
+
+
+def check_tmp(module):
+    path = module.params['tmp_path']
+    try:
+        with tempfile.TemporaryFile(dir=path):
+            pass
+    except (IOError, OSError) as e:
+        return False, 'The {} directory is not writable by the Ansible user: {}'.format(path, e)
+    return True, '{} is writable'.format(path)
+
+
+def existing_parent(path):
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    return path
+
+
+def check_disk(module):
+    required = module.params['required_disk_mb']
+    low = []
+    devices = set()
+    for path in module.params['disk_paths']:
+        path = existing_parent(os.path.abspath(path))
+        device = os.stat(path).st_dev
+        if device in devices:
+            continue
+        devices.add(device)
+        stat_result = os.statvfs(path)
+        available = stat_result.f_bavail * stat_result.f_frsize // (1024 * 1024)
+        if available < required:
+            low.append('{} has {}MB'.format(path, available))
+    if low:
+        return False, 'Not enough free disk space, minimum required is {}MB: {}'.format(required, ', '.join(low))
+    return True, 'At least {}MB free on {}'.format(required, ', '.join(module.params['disk_paths']))
+
+
+def available_memory_mb():
+    meminfo = {}
+    with open('/proc/meminfo') as meminfo_file:
+        for line in meminfo_file:
+            fields = line.split()
+            if len(fields) >= 2:
+                meminfo[fields[0].rstrip(':')] = int(fields[1])
+    if 'MemAvailable' in meminfo:
+        return meminfo['MemAvailable'] // 1024
+    # Kernels older than 3.14, same as ansible_memory_mb.nocache.free
+    return (meminfo.get('MemFree', 0) + meminfo.get('Buffers', 0) + meminfo.get('Cached', 0)) // 1024
+
+
+def check_memory(module):
+    required = module.params['required_memory_mb']
+    available = available_memory_mb()
+    if available < required:
+        return False, 'Not enough memory, only {}MB available, minimum required is {}MB'.format(available, required)
+    return True, '{}MB available'.format(available)
+
+
+def resolve(address):
+    try:
+        return sorted(set(info[4][0] for info in socket.getaddrinfo(address, None, 0, socket.SOCK_STREAM))), None
+    except socket.gaierror as e:
+        return [], str(e)
+
+
+def is_local(ip):
+    # Binding only succeeds on an address of one of the host's interfaces
+    family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.bind((ip, 0))
+        return True
+    except (IOError, OSError):
+        return False
+    finally:
+        sock.close()
+
+
+def probe(ip, port, timeout):
+    family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    started = time.time()
+    try:
+        sock.connect((ip, port))
+        state = 'open'
+    except socket.timeout:
+        state = 'timeout'
+    except (IOError, OSError) as e:
+        state = 'refused' if e.errno == errno.ECONNREFUSED else 'unreachable'
+    finally:
+        sock.close()
+    return state, round((time.time() - started) * 1000)
+
+
+def run_network_checks(module, checks, report, failures):
+    hostname = module.params['hostname']
+    peers = []
+    for peer in module.params['peers']:
+        if not peer.get('address') or not peer.get('port'):
+            module.fail_json(msg='Each peer needs an address and a port: {}'.format(peer))
+        peer = dict(peer, port=int(peer['port']))
+        if peer not in peers:
+            peers.append(peer)
+
+    addresses = sorted(set(peer['address'] for peer in peers) | (set([hostname]) if hostname else set()))
+    with ThreadPoolExecutor(max_workers=max(module.params['workers'], 1)) as executor:
+        resolved = dict(zip(addresses, executor.map(resolve, addresses)))
+
+        if 'dns' in checks:
+            unresolved = ['{} ({})'.format(address, error) for address, (ips, error) in resolved.items() if error]
+            if hostname and not resolved[hostname][1] and not any(is_local(ip) for ip in resolved[hostname][0]):
+                not_local = '{} resolves to {}, which is not an address of this host'.format(
+                    hostname, ', '.join(resolved[hostname][0]))
+                if module.params['require_local_hostname']:
+                    unresolved.append(not_local)
+                else:
+                    module.warn(not_local)
+            report['checks']['dns'] = dict(ok=not unresolved, msg='Unable to resolve: {}'.format(', '.join(unresolved))
+                                           if unresolved else 'Resolved {} hostnames'.format(len(addresses)))
+            if unresolved:
+                failures.append(report['checks']['dns']['msg'])
+
+        if 'ports' not in checks:
+            return
+        probed = [peer for peer in peers if resolved[peer['address']][0]]
+        timeout = module.params['timeout']
+        states = executor.map(lambda peer: probe(resolved[peer['address']][0][0], peer['port'], timeout), probed)
+        for peer, (state, elapsed_ms) in zip(probed, states):
+            report['peers'].append(dict(peer, ip=resolved[peer['address']][0][0], state=state, elapsed_ms=elapsed_ms))
+    # Names that do not resolve are reported by the dns check
+    report['peers'].extend(dict(peer, ip=None, state='unresolved', elapsed_ms=0) for peer in peers if peer not in probed)
+
+    blocked = ['{}:{} {}'.format(peer['address'], peer['port'], peer['state'])
+               for peer in report['peers'] if peer['state'] not in REACHABLE_STATES + ('unresolved',)]
+    report['checks']['ports'] = dict(ok=not blocked, msg='Unable to reach: {}'.format(', '.join(blocked))
+                                     if blocked else 'Reached {} peer ports'.format(
+                                         len([peer for peer in report['peers'] if peer['state'] in REACHABLE_STATES])))
+    if blocked:
+        failures.append(report['checks']['ports']['msg'])
+
+
+def run_module():
+    module_args = dict(
+        checks=dict(type='list', elements='str', required=False, choices=CHECKS, default=CHECKS),
+        supported_os_versions=dict(type='dict', required=False, default={}),
+        tmp_path=dict(type='path', required=False, default='/tmp'),
+        disk_paths=dict(type='list', elements='path', required=False, default=['/']),
+        required_disk_mb=dict(type='int', required=False, default=0),
+        required_memory_mb=dict(type='int', required=False, default=0),
+        hostname=dict(type='str', required=False),
+        require_local_hostname=dict(type='bool', required=False, default=False),
+        peers=dict(type='list', elements='dict', required=False, default=[]),
+        max_clock_skew=dict(type='float', required=False, default=30),
+        timeout=dict(type='float', required=False, default=3),
+        workers=dict(type='int', required=False, default=32)
+    )
+
+    started = time.time()
+    result = dict(
+        changed=False,
+        message='',
+        report=dict(checks={}, peers=[]),
+        failures=[],
+        time=started,
+        elapsed=0
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    checks = module.params['checks']
+    report = result['report']
+    for name, check in (('os', check_os), ('tmp', check_tmp), ('disk', check_disk), ('memory', check_memory)):
+        if name not in checks:
+            continue
+        ok, msg = check(module)
+        report['checks'][name] = dict(ok=ok, msg=msg)
+        if not ok:
+            result['failures'].append(msg)
+
+    if 'dns' in checks or 'ports' in checks:
+        run_network_checks(module, checks, report, result['failures'])
+
+    result['elapsed'] = time.time() - started
+    result['message'] = '{} of {} checks failed'.format(len(result['failures']), len(report['checks'])) \
+        if result['failures'] else 'All {} checks passed'.format(len(report['checks']))
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.91',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: kafka_broker_config
+
+short_description: Applies dynamically updatable Kafka broker properties without a restart.
+
+version_added: "7.6.1"
+
+description:
+    - "Diffs the desired broker properties against the server.properties file currently in place and sorts every changed
+    key into dynamic or static."
+    - "Changed dynamic keys are applied live with a single kafka-configs call for the broker. A restart is only reported
+    as required when static keys changed, when keys were removed or when the live update fails."
+    - "The hours and minutes forms of the retention and roll settings are read-only, their changes are applied through
+    the dynamic ms form unless the ms form itself is set."
+    - "The module does not write server.properties, the template task that follows it does."
+
+options:
+    path:
+        type: path
+        description:
+            - Path of the server.properties file currently used by the broker
+        required: true
+    properties:
+        type: dict
+        description:
+            - Desired broker properties, as rendered into server.properties
+        required: true
+    bootstrap_server:
+        type: str
+        description:
+            - host:port of the broker listener kafka-configs connects to
+        required: true
+    command_config:
+        type: path
+        description:
+            - Client properties file passed to kafka-configs
+        required: false
+    kafka_configs:
+        type: path
+        description:
+            - Path to the kafka-configs executable
+        required: true
+    dynamic_keys:
+        type: list
+        elements: str
+        description:
+            - Additional keys to treat as dynamically updatable
+        required: false
+        default: []
+
+author:
+    - Confluent Inc
+'''
+
+EXAMPLES = '''
+- name: Apply Dynamic Kafka Broker Config
+  confluent.platform.kafka_broker_config:
+    path: /etc/kafka/server.properties
+    properties: "{{ kafka_broker_final_properties }}"
+    bootstrap_server: kafka-broker1:9091
+    command_config: /etc/kafka/client.properties
+    kafka_configs: /usr/bin/kafka-configs
+'''
+
+RETURN = '''
+message:
+    description: The output message that the module generates
+    type: str
+    returned: always
+dynamic_changed:
+    description: Keys updated live on the broker, or that would be when a restart is required anyway
+    type: list
+    returned: always
+static_changed:
+    description: Keys that can only be picked up by restarting the broker, including removed dynamic keys
+    type: list
+    returned: always
+restart_required:
+    description: Whether server.properties changes need a broker restart to take effect
+    type: bool
+    returned: always
+'''
+
+import os
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+__metaclass__ = type
+
+# Broker configs with a per-broker or cluster-wide dynamic update mode
+DYNAMIC_KEYS = frozenset((
+    'background.threads',
+    'compression.type',
+    'log.cleaner.backoff.ms',
+    'log.cleaner.dedupe.buffer.size',
+    'log.cleaner.delete.retention.ms',
+    'log.cleaner.io.buffer.load.factor',
+    'log.cleaner.io.buffer.size',
+    'log.cleaner.io.max.bytes.per.second',
+    'log.cleaner.max.compaction.lag.ms',
+    'log.cleaner.min.cleanable.ratio',
+    'log.cleaner.min.compaction.lag.ms',
+    'log.cleaner.threads',
+    'log.cleanup.policy',
+    'log.flush.interval.messages',
+    'log.flush.interval.ms',
+    'log.index.interval.bytes',
+    'log.index.size.max.bytes',
+    'log.message.downconversion.enable',
+    'log.message.timestamp.difference.max.ms',
+    'log.message.timestamp.type',
+    'log.preallocate',
+    'log.retention.bytes',
+    'log.retention.ms',
+    'log.roll.jitter.ms',
+    'log.roll.ms',
+    'log.segment.bytes',
+    'log.segment.delete.delay.ms',
+    'max.connection.creation.rate',
+    'max.connections',
+    'max.connections.per.ip',
+    'max.connections.per.ip.overrides',
+    'message.max.bytes',
+    'metric.reporters',
+    'min.insync.replicas',
+    'num.io.threads',
+    'num.network.threads',
+    'num.recovery.threads.per.data.dir',
+    'num.replica.fetchers',
+    'unclean.leader.election.enable',
+))
+
+# Read-only broker configs whose ms synonym is dynamic, in increasing order of precedence, with their unit in ms
+MS_SYNONYMS = {
+    'log.retention.ms': (('log.retention.hours', 3600000), ('log.retention.minutes', 60000)),
+    'log.roll.ms': (('log.roll.hours', 3600000),),
+    'log.roll.jitter.ms': (('log.roll.jitter.hours', 3600000),),
+}
+SYNONYM_TARGETS = dict((synonym, target) for target, synonyms in MS_SYNONYMS.items() for synonym, unit in synonyms)
+
+# Keystores, truststores and JAAS configs of a listener are reloaded when updated through the listener prefix
+DYNAMIC_PATTERNS = (
+    re.compile(r'^listener\.name\.[^.]+\.ssl\.(keystore\.(type|location|password|key|certificate\.chain)|key\.password|'
+               r'truststore\.(type|location|password|certificates))$'),
+    re.compile(r'^listener\.name\.[^.]+\.[^.]+\.sasl\.jaas\.config$'),
+)
+
+
+def read_properties(path):
+    properties = {}
+    with open(path) as properties_file:
+        for line in properties_file:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            properties[key] = value
+    return properties
+
+
+def to_property(value):
+    # Matches how server.properties.j2 renders values
+    return str(value)
+
+
+def is_dynamic(key, dynamic_keys):
+    return key in dynamic_keys or key in SYNONYM_TARGETS or any(pattern.match(key) for pattern in DYNAMIC_PATTERNS)
+
+
+def synonym_value(target, desired):
+    # Same resolution as the broker: the most precise form set wins, negative durations disable the limit
+    value = None
+    for synonym, unit in MS_SYNONYMS[target]:
+        if synonym in desired:
+            value = int(desired[synonym]) * unit
+    return None if value is None else str(max(value, -1))
+
+
+def dynamic_updates(keys, desired):
+    """
+    Maps the changed dynamic keys to the configs to alter, hours and minutes forms becoming their ms synonym.
+    Raises ValueError when a synonym does not hold a number.
+    """
+    updates = {}
+    for key in keys:
+        target = SYNONYM_TARGETS.get(key)
+        if target is None:
+            updates[key] = desired[key]
+        elif target not in desired:
+            # The explicit ms form takes precedence, a change of the read-only form has no effect then
+            updates[target] = synonym_value(target, desired)
+    return updates
+
+
+def broker_id(properties):
+    for key in ('broker.id', 'node.id'):
+        if key in properties:
+            return to_property(properties[key])
+    return None
+
+
+def classify(current, desired, dynamic_keys):
+    dynamic_changed = []
+    dynamic_removed = []
+    static_changed = []
+    for key in sorted(set(current) | set(desired)):
+        if current.get(key) == desired.get(key):
+            continue
+        if not is_dynamic(key, dynamic_keys):
+            static_changed.append(key)
+        elif key in desired:
+            dynamic_changed.append(key)
+        else:
+            dynamic_removed.append(key)
+    return dynamic_changed, dynamic_removed, static_changed
+
+
+def kafka_configs(module, *args):
+    command = [
+        module.params['kafka_configs'],
+        '--bootstrap-server', module.params['bootstrap_server'],
+        '--entity-type', 'brokers',
+        '--entity-name', broker_id(module.params['properties'])
+    ]
+    command.extend(args)
+    if module.params['command_config']:
+        command.extend(['--command-config', module.params['command_config']])
+    return module.run_command(command)
+
+
+def dynamic_overrides(module):
+    # Lines look like "  log.retention.ms=1000 sensitive=false synonyms={...}"
+    rc, stdout, stderr = kafka_configs(module, '--describe')
+    if rc != 0:
+        return None
+    return set(line.strip().split('=', 1)[0] for line in stdout.splitlines() if line.startswith(' ') and '=' in line)
+
+
+def apply_dynamic(module, keys, deleted_keys, desired):
+    args = ['--alter']
+    if keys:
+        # The values go through a file so passwords stay off the command line and commas need no escaping
+        config_path = os.path.join(module.tmpdir, 'dynamic-broker-config.properties')
+        fd = os.open(config_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as config_file:
+            for key in keys:
+                config_file.write('{}={}\n'.format(key, desired[key]))
+        args.extend(['--add-config-file', config_path])
+    if deleted_keys:
+        args.extend(['--delete-config', ','.join(deleted_keys)])
+    return kafka_configs(module, *args)
+
+
+def run_module():
+    module_args = dict(
+        path=dict(type='path', required=True),
+        properties=dict(type='dict', required=True, no_log=True),
+        bootstrap_server=dict(type='str', required=True),
+        command_config=dict(type='path', required=False),
+        kafka_configs=dict(type='path', required=True),
+        dynamic_keys=dict(type='list', elements='str', required=False, default=[])
+    )
+
+    result = dict(
+        changed=False,
+        message='',
+        dynamic_changed=[],
+        static_changed=[],
+        restart_required=False
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    desired = dict((key, to_property(value)) for key, value in module.params['properties'].items())
+    if not os.path.isfile(module.params['path']) or broker_id(desired) is None:
+        result['restart_required'] = True
+        result['message'] = 'No config in place, the broker needs to be (re)started'
+        module.exit_json(**result)
+
+    dynamic_keys = DYNAMIC_KEYS | frozenset(module.params['dynamic_keys'])
+    dynamic_changed, dynamic_removed, static_changed = classify(
+        read_properties(module.params['path']), desired, dynamic_keys)
+    # A removed key falls back to the value loaded from server.properties at startup, only a restart resets it
+    result['dynamic_changed'] = dynamic_changed
+    result['static_changed'] = static_changed + dynamic_removed
+    result['restart_required'] = bool(result['static_changed'])
+
+    if not dynamic_changed and not dynamic_removed:
+        result['message'] = 'Static config changed, the broker needs to be restarted' \
+            if result['restart_required'] else 'No config change'
+        module.exit_json(**result)
+
+    if module.check_mode:
+        result['changed'] = bool(dynamic_changed)
+        result['message'] = 'Dynamic config would be applied'
+        module.exit_json(**result)
+
+    try:
+        updates = dynamic_updates(dynamic_changed, desired)
+    except ValueError:
+        # Not a number, left to the broker to validate at startup
+        result['static_changed'] = sorted(result['static_changed'] + dynamic_changed)
+        result['dynamic_changed'] = []
+        result['restart_required'] = True
+        result['message'] = 'Static config changed, the broker needs to be restarted'
+        module.exit_json(**result)
+
+    # Dynamic values are stored in the cluster metadata and take precedence over server.properties,
+    # so they are kept in sync even when the broker gets restarted afterwards
+    deleted_keys = []
+    if dynamic_removed:
+        overrides = dynamic_overrides(module)
+        removed = set(SYNONYM_TARGETS.get(key, key) for key in dynamic_removed)
+        removed = removed.difference(updates, desired)
+        deleted_keys = sorted(overrides.intersection(removed)) if overrides is not None else []
+
+    if not updates and not deleted_keys:
+        result['message'] = 'Static config changed, the broker needs to be restarted' \
+            if result['restart_required'] else 'No effective config change'
+        module.exit_json(**result)
+
+    rc, stdout, stderr = apply_dynamic(module, sorted(updates), deleted_keys, updates)
+    if rc != 0:
+        # The broker may be down or not accept the update, a restart picks the new config up anyway
+        result['restart_required'] = True
+        result['message'] = 'Dynamic config could not be applied, the broker needs to be restarted: {}'.format(
+            (stderr or stdout).strip())
+        if deleted_keys or dynamic_overrides(module):
+            module.warn('Broker {} has dynamic config overrides that could not be updated, they take precedence over '
+                        'server.properties until updated with kafka-configs'.format(broker_id(desired)))
+        module.exit_json(**result)
+
+    result['changed'] = True
+    result['message'] = 'Dynamic config applied: {}'.format(', '.join(sorted(updates) + deleted_keys))
+    if result['restart_required']:
+        result['message'] += ', static config changed, the broker needs to be restarted'
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -33,7 +33,36 @@ options:
         elements: dict
         description:
             - Dict of active connectors (each connector object must have a 'name' and a 'config' field)
-        required: true
+            - An optional 'state' field, 'running' (default) or 'paused', pauses or resumes the connector
+            - Required unless connectors_path is set
+        required: false
+    connectors_path:
+        type: path
+        description:
+            - Path on the host to the active connectors, instead of active_connectors. Either an NDJSON file with one
+              connector object per line, or a directory with one connector object per .json file
+            - The definitions are read one at a time, a content hash of each is kept in hash_dir once it is deployed
+              and connectors whose definition did not change since are neither sent nor compared again
+        required: false
+    hash_dir:
+        type: path
+        description:
+            - Directory on the host the hashes of the deployed connectors_path definitions are kept in
+        required: false
+        default: ~/.ansible/confluent_connector_hashes
+    force:
+        type: bool
+        description:
+            - Compare every connector of connectors_path with its current config, ex. after a change made through the REST API
+        required: false
+        default: false
+    failed_tasks_retries:
+        type: int
+        description:
+            - Number of times the failed tasks of a connector are restarted before reporting the failure
+            - Only the failed connector and tasks are restarted, healthy tasks keep running
+        required: false
+        default: 0
     timeout:
         type: int
         description:
@@ -68,8 +97,13 @@ author:
 EXAMPLES = '''
 - name: Deploy Some connector
   connect_url: kafka_connect_http_protocol://0.0.0.0:kafka_connect_rest_port/connectors
-  active_connectors: [{"name": "test-6-sink", "config": { .../... }},{"name": "test-5-sink", "config": { .../... }}]
+  active_connectors: [{"name": "test-6-sink", "config": { .../... }},{"name": "test-5-sink", "state": "paused", "config": { .../... }}]
   timeout: 20
+  failed_tasks_retries: 2
+
+- name: Deploy connectors from an NDJSON file
+  connect_url: kafka_connect_http_protocol://0.0.0.0:kafka_connect_rest_port/connectors
+  connectors_path: /etc/kafka/connectors.ndjson
 '''
 
 RETURN = '''
@@ -77,24 +111,87 @@ message:
     description: The output message that the module generates
     type: str
     returned: always
+metrics:
+    description:
+        - Call counts, latencies, bytes transferred and retries of the Connect REST calls, keyed by category then endpoint.
+        - Consumed by the confluent.platform.metrics callback.
+    type: dict
+    returned: always
 '''
 
+import hashlib
 import json
+import os
 import time
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.urls import open_url
 import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible_collections.confluent.platform.plugins.module_utils import connector_definitions
+from ansible_collections.confluent.platform.plugins.module_utils.metrics import Metrics
 __metaclass__ = type
 
 RUNNING_STATE = "RUNNING"
+PAUSED_STATE = "PAUSED"
+FAILED_STATE = "FAILED"
+# desired state of a connector -> expected state of the connector and its tasks
+EXPECTED_STATES = {'running': RUNNING_STATE, 'paused': PAUSED_STATE}
 WAIT_TIME_BEFORE_GET_STATUS = 1  # seconds
 TIMEOUT_WAITING_FOR_TASK_STATUS = 30  # seconds
+WAIT_TIME_AFTER_TASKS_RESTART = 5  # seconds
+RETRYABLE_STATUS_CODES = (404, 409)
+
+METRICS = Metrics()
+
+
+def endpoint_name(method, url):
+    # groups calls by endpoint rather than by connector to keep the metric cardinality low
+    last_segment = url.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+    if last_segment in ('status', 'config', 'restart', 'pause', 'resume'):
+        return "{} /connectors/<name>/{}".format(method, last_segment)
+    if last_segment == 'connectors':
+        return "{} /connectors".format(method)
+    return "{} /connectors/<name>".format(method)
+
+
+class ConnectResponse(object):
+    """
+    Connect REST response whose body was already read, so the bytes actually received are known even when the
+    response is chunked and has no Content-Length.
+    """
+
+    def __init__(self, code, body):
+        self.code = code
+        self.body = body
+
+    def getcode(self):
+        return self.code
+
+    def read(self):
+        return self.body
+
+
+# open_url wrapper recording the latency and payload sizes of every Connect REST call
+def open_connect_url(url, method='GET', data=None, **kwargs):
+    start = time.time()
+    body = b''
+    try:
+        response = open_url(url, method=method, data=data, **kwargs)
+        body = response.read()
+        return ConnectResponse(response.getcode(), body)
+    finally:
+        METRICS.record(
+            'http',
+            endpoint_name(method, url),
+            time.time() - start,
+            bytes_sent=len(data or ''),
+            bytes_received=len(body)
+        )
 
 
 def get_current_connectors(connect_url, timeout, username, password, client_cert, client_key):
     try:
-        res = open_url(
+        res = open_connect_url(
             connect_url,
             validate_certs=False,
             timeout=timeout,
@@ -112,7 +209,7 @@ def get_current_connectors(connect_url, timeout, username, password, client_cert
 
 def remove_connector(connect_url, name, timeout, username, password, client_cert, client_key):
     url = "{}/{}".format(connect_url, name)
-    r = open_url(
+    r = open_connect_url(
         method='DELETE',
         url=url,
         validate_certs=False,
@@ -126,11 +223,12 @@ def remove_connector(connect_url, name, timeout, username, password, client_cert
 
 
 # return value: success (bool), changed (bool), message (str)
-def create_new_connector(connect_url, name, config, timeout, username, password, client_cert, client_key):
+def create_new_connector(connect_url, name, config, timeout, username, password, client_cert, client_key,
+                         state='running', failed_tasks_retries=0):
     data = json.dumps({'name': name, 'config': config})
     headers = {'Content-Type': 'application/json'}
     try:
-        r = open_url(
+        r = open_connect_url(
             method='POST',
             url=connect_url,
             data=data,
@@ -150,7 +248,14 @@ def create_new_connector(connect_url, name, config, timeout, username, password,
     changed = True
     message = "new connector added"
 
-    is_running, failures_msg = get_connector_status(connect_url, name, timeout, username, password, client_cert, client_key)
+    if state != 'running':
+        state_success, _state_changed, state_msg = set_connector_state(
+            connect_url, name, state, timeout, username, password, client_cert, client_key)
+        if not state_success:
+            return False, changed, state_msg
+
+    is_running, failures_msg = get_connector_status(connect_url, name, timeout, username, password, client_cert, client_key,
+                                                    EXPECTED_STATES[state], failed_tasks_retries)
     if not is_running:
         success = False
         message = failures_msg
@@ -166,13 +271,59 @@ def truncate_error_message(message):
     return message[0:200]
 
 
-# to be successful, the connector and all its tasks must be running
-# if anything fails, we fail and return the associated error messages
-def get_connector_status(connect_url, connector_name, timeout, username, password, client_cert, client_key):
-    time.sleep(WAIT_TIME_BEFORE_GET_STATUS)
-    status_url = "{}/{}/status".format(connect_url, connector_name)
+# restarts the failed connector instance and failed tasks only, healthy tasks keep running
+# (KIP-745, older Connect versions ignore the parameters and restart the connector instance only)
+# Connect answers 409 while the workers rebalance, the status is then read again and the restart is only a success
+# once nothing is left failed
+def restart_failed(connect_url, name, timeout, username, password, client_cert, client_key):
+    deadline = time.time() + TIMEOUT_WAITING_FOR_TASK_STATUS
+    restart_url = "{}/{}/restart?includeTasks=true&onlyFailed=true".format(connect_url, name)
+    status_url = "{}/{}/status".format(connect_url, name)
+    while True:
+        try:
+            r = open_connect_url(
+                method='POST',
+                url=restart_url,
+                validate_certs=False,
+                timeout=timeout,
+                url_username=username,
+                url_password=password,
+                client_cert=client_cert,
+                client_key=client_key
+            )
+            return r.getcode() in (200, 202, 204), None
+        except urllib_error.HTTPError as e:
+            if e.code != 409:
+                return False, "failed to restart the failed tasks ({})".format(e)
+            conflict = e
+
+        try:
+            current_status = read_status(status_url, deadline, timeout, username, password, client_cert, client_key)
+        except urllib_error.HTTPError as e:
+            return False, "failed to get the connector status ({})".format(e)
+        states = [current_status['connector']['state']] + [task['state'] for task in current_status['tasks']]
+        if FAILED_STATE not in states:
+            return True, None
+        if time.time() >= deadline:
+            return False, "failed to restart the failed tasks ({})".format(conflict)
+        METRICS.retry('http', endpoint_name('POST', restart_url))
+        time.sleep(1)
+
+
+def retry_transient(request, deadline, method, url):
+    # Connect answers 404 until a new connector is registered and 409 while the workers rebalance
+    while True:
+        try:
+            return request()
+        except urllib_error.HTTPError as e:
+            if e.code not in RETRYABLE_STATUS_CODES or time.time() >= deadline:
+                raise
+        METRICS.retry('http', endpoint_name(method, url))
+        time.sleep(1)
+
 
-    res = open_url(
+def read_status(status_url, deadline, timeout, username, password, client_cert, client_key):
+    res = retry_transient(lambda: open_connect_url(
         status_url,
         validate_certs=False,
         timeout=timeout,
@@ -180,58 +331,118 @@ def get_connector_status(connect_url, connector_name, timeout, username, passwor
         url_password=password,
         client_cert=client_cert,
         client_key=client_key
-    )
-    current_status = json.loads(res.read())
+    ), deadline, 'GET', status_url)
+    return json.loads(res.read())
 
-    connector_status = current_status['connector']['state']
 
-    failures = []
-    if connector_status != RUNNING_STATE:
-        failures.append("connector state paused or failed")
+# return value: success (bool), changed (bool), message (str)
+def set_connector_state(connect_url, name, state, timeout, username, password, client_cert, client_key):
+    deadline = time.time() + TIMEOUT_WAITING_FOR_TASK_STATUS
+    status_url = "{}/{}/status".format(connect_url, name)
+    try:
+        current_state = read_status(status_url, deadline, timeout, username, password, client_cert, client_key)['connector']['state']
+    except urllib_error.HTTPError as e:
+        return False, False, "failed to get the connector state ({})".format(e)
 
-    nb_tasks = len(current_status['tasks'])
-    time_waited = 0
-    while not nb_tasks:
-        time_waited += 1
-        time.sleep(1)
-        if time_waited > TIMEOUT_WAITING_FOR_TASK_STATUS:
-            return False, "timeout getting task status"
+    if state == 'paused' and current_state != PAUSED_STATE:
+        action = 'pause'
+    elif state == 'running' and current_state == PAUSED_STATE:
+        action = 'resume'
+    else:
+        return True, False, None
 
-        res = open_url(
-            status_url,
+    action_url = "{}/{}/{}".format(connect_url, name, action)
+    try:
+        r = retry_transient(lambda: open_connect_url(
+            method='PUT',
+            url=action_url,
             validate_certs=False,
             timeout=timeout,
             url_username=username,
             url_password=password,
             client_cert=client_cert,
             client_key=client_key
-        )
-        current_status = json.loads(res.read())
-        nb_tasks = len(current_status['tasks'])
+        ), deadline, 'PUT', action_url)
+    except urllib_error.HTTPError as e:
+        return False, False, "failed to {} the connector ({})".format(action, e)
+    return r.getcode() in (200, 202, 204), True, "connector {}d".format(action)
+
+
+# to be successful, the connector and all its tasks, if it has any, must be in the expected state (running unless paused)
+# pausing and resuming are asynchronous, so the status is polled until it is reached or a task failed
+# failed tasks are restarted up to failed_tasks_retries times
+# if anything fails, we fail and return the associated error messages
+def get_connector_status(connect_url, connector_name, timeout, username, password, client_cert, client_key,
+                         expected_state=RUNNING_STATE, failed_tasks_retries=0):
+    time.sleep(WAIT_TIME_BEFORE_GET_STATUS)
+    deadline = time.time() + TIMEOUT_WAITING_FOR_TASK_STATUS
+    status_url = "{}/{}/status".format(connect_url, connector_name)
+
+    while True:
+        try:
+            current_status = read_status(status_url, deadline, timeout, username, password, client_cert, client_key)
+        except urllib_error.HTTPError as e:
+            return False, "failed to get the connector status ({})".format(e)
+        # a connector may legitimately run without tasks, ex. a source with nothing to read yet
+        states = [current_status['connector']['state']] + [task['state'] for task in current_status['tasks']]
+        if all(task_state == expected_state for task_state in states):
+            return True, None
+        if FAILED_STATE in states or time.time() >= deadline:
+            break
+        METRICS.retry('http', endpoint_name('GET', status_url))
+        time.sleep(1)
 
+    connector_status = current_status['connector']['state']
+    failures = []
+    if connector_status != expected_state:
+        failures.append("connector state {}".format(connector_status.lower()))
     for task in current_status['tasks']:
-        if task['state'] != RUNNING_STATE:
-            failures.append("task {}: {}".format(task['id'], truncate_error_message(task.get('trace'))))
+        if task['state'] != expected_state:
+            failures.append("task {}: {}".format(task['id'], truncate_error_message(task.get('trace') or task['state'])))
 
-    if failures:
-        return False, ", ".join(failures)
+    if failed_tasks_retries > 0 and FAILED_STATE in states:
+        restarted, restart_msg = restart_failed(connect_url, connector_name, timeout, username, password, client_cert, client_key)
+        if not restarted:
+            return False, restart_msg
+        METRICS.retry('http', endpoint_name('POST', "{}/{}/restart".format(connect_url, connector_name)))
+        time.sleep(WAIT_TIME_AFTER_TASKS_RESTART)
+        return get_connector_status(connect_url, connector_name, timeout, username, password, client_cert, client_key,
+                                    expected_state, failed_tasks_retries - 1)
 
-    return True, None
+    return False, ", ".join(failures)
 
 
 # return value: success (bool), changed (bool), message (str)
-def update_existing_connector(connect_url, name, config, timeout, username, password, client_cert, client_key):
+def update_existing_connector(connect_url, name, config, timeout, username, password, client_cert, client_key,
+                              state='running', failed_tasks_retries=0):
     url = "{}/{}/config".format(connect_url, name)
-    restart_url = "{}/{}/restart".format(connect_url, name)
 
-    res = open_url(url, validate_certs=False, timeout=timeout, url_username=username, url_password=password, client_cert=client_cert, client_key=client_key)
+    res = open_connect_url(
+        url,
+        validate_certs=False,
+        timeout=timeout,
+        url_username=username,
+        url_password=password,
+        client_cert=client_cert,
+        client_key=client_key
+    )
     current_config = json.loads(res.read())
 
     existing_config = config.copy()
     existing_config.update({'name': name})
 
     if current_config == existing_config:
-        return True, False, "no configuration change"
+        success, changed, message = set_connector_state(
+            connect_url, name, state, timeout, username, password, client_cert, client_key)
+        if not success:
+            return success, changed, message
+        # unchanged connectors are only checked when they changed state or when failed tasks are to be recovered
+        if changed or failed_tasks_retries > 0:
+            is_running, failures_msg = get_connector_status(connect_url, name, timeout, username, password, client_cert, client_key,
+                                                            EXPECTED_STATES[state], failed_tasks_retries)
+            if not is_running:
+                return False, changed, failures_msg
+        return True, changed, message or "no configuration change"
 
     success = True
     message = ""
@@ -242,7 +453,7 @@ def update_existing_connector(connect_url, name, config, timeout, username, pass
     headers = {'Content-Type': 'application/json'}
     r = None
     try:
-        r = open_url(
+        r = open_connect_url(
             method='PUT',
             url=url,
             data=data,
@@ -263,33 +474,23 @@ def update_existing_connector(connect_url, name, config, timeout, username, pass
     if not success:
         return success, changed, message
 
-    # configuration was updated, let's restart the connector
+    # configuration was updated, Connect reconfigures the tasks by itself so only what failed is restarted
 
     message = "connector configuration updated"
-    success = True
-    try:
-        r = open_url(
-            method='POST',
-            url=restart_url,
-            validate_certs=False,
-            timeout=timeout,
-            url_username=username,
-            url_password=password,
-            client_cert=client_cert,
-            client_key=client_key
-        )
-    except urllib_error.HTTPError:
-        pass
-    finally:
-        if r.getcode() not in (200, 204, 409):
-            success = False
-            message = "connector configuration updated but failed to restart " \
-                      "after a configuration update. {}".format(r.msg)
+    success, restart_msg = restart_failed(connect_url, name, timeout, username, password, client_cert, client_key)
+    if not success:
+        return success, changed, "connector configuration updated but {} after a configuration update".format(restart_msg)
+
+    state_success, _state_changed, state_msg = set_connector_state(
+        connect_url, name, state, timeout, username, password, client_cert, client_key)
+    if not state_success:
+        return False, changed, state_msg
 
     # get the connector's status
     # if failed, return it
     # if there's a rebalance, wait for it to finish? how?
-    is_running, failures_msg = get_connector_status(connect_url, name, timeout, username, password, client_cert, client_key)
+    is_running, failures_msg = get_connector_status(connect_url, name, timeout, username, password, client_cert, client_key,
+                                                    EXPECTED_STATES[state], failed_tasks_retries)
     if not is_running:
         success = False
         message = failures_msg
@@ -304,24 +505,88 @@ def format_output(connector_name, success, message):
         return "{}: {}".format(connector_name, message)
 
 
+# definitions as (name, digest, source) tuples, source is the connector itself for inline definitions,
+# or its location in connectors_path which is only loaded when the connector has to be deployed
+def read_definitions(module):
+    if module.params['connectors_path'] is None:
+        definitions = []
+        for connector in module.params['active_connectors']:
+            connector_definitions.validate(connector, connector.get('name'))
+            definitions.append((connector['name'], None, connector))
+    else:
+        definitions = list(connector_definitions.scan(module.params['connectors_path']))
+
+    seen = set()
+    for name, _digest, _source in definitions:
+        if name in seen:
+            raise connector_definitions.DefinitionError("{}: connector defined more than once".format(name))
+        seen.add(name)
+    return definitions
+
+
+def hashes_path(hash_dir, connect_url):
+    return os.path.join(hash_dir, "{}.json".format(hashlib.sha256(connect_url.encode('utf-8')).hexdigest()))
+
+
+def read_hashes(path):
+    try:
+        with open(path) as hashes_file:
+            return json.load(hashes_file)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def write_hashes(path, hashes):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path), 0o700)
+    tmp_path = path + '.tmp'
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as hashes_file:
+        json.dump(hashes, hashes_file)
+    os.rename(tmp_path, path)
+
+
 def run_module():
     module_args = dict(
         connect_url=dict(type='str', required=True),
-        active_connectors=dict(type='list', elements='dict', required=True),
+        active_connectors=dict(type='list', elements='dict', required=False),
+        connectors_path=dict(type='path', required=False),
+        hash_dir=dict(type='path', required=False, default='~/.ansible/confluent_connector_hashes'),
+        force=dict(type='bool', required=False, default=False),
         timeout=dict(type='int', required=False, default=30),
         username=dict(type='str', required=False),
         password=dict(type='str', required=False, no_log=True),
         client_cert=dict(type='path', required=False),
         client_key=dict(type='path', required=False),
+        failed_tasks_retries=dict(type='int', required=False, default=0),
     )
 
-    result = dict(changed=False, message='')
+    result = dict(changed=False, message='', metrics=METRICS.as_dict())
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=[('active_connectors', 'connectors_path')],
+        required_one_of=[('active_connectors', 'connectors_path')],
+        supports_check_mode=True
+    )
+
+    try:
+        definitions = read_definitions(module)
+    except (IOError, OSError, ValueError) as e:
+        module.fail_json(msg=str(e), **result)
 
     if module.check_mode:
         module.exit_json(**result)
 
+    # hashes are only kept for connectors_path, inline definitions are always compared
+    hashes_file = None
+    hashes = {}
+    if module.params['connectors_path'] is not None:
+        hashes_file = hashes_path(module.params['hash_dir'], module.params['connect_url'])
+        if not module.params['force']:
+            hashes = read_hashes(hashes_file)
+    deployed_hashes = {}
+
     #
     # module action:
     # - make a diff of existing (current) vs kept (active) connectors and removes the un-kept ones
@@ -334,6 +599,7 @@ def run_module():
     connector_failure = False
     output_messages = []
     added_updated_messages = []
+    unchanged_definitions = 0
     try:
         current_connector_names = get_current_connectors(
             connect_url=module.params['connect_url'],
@@ -343,7 +609,7 @@ def run_module():
             client_cert=module.params['client_cert'],
             client_key=module.params['client_key']
         )
-        active_connector_names = (c['name'] for c in module.params['active_connectors'])
+        active_connector_names = (name for name, _digest, _source in definitions)
         deleted_connector_names = set(current_connector_names) - set(active_connector_names)
 
         for to_delete in deleted_connector_names:
@@ -360,9 +626,25 @@ def run_module():
         if deleted_connector_names:
             output_messages.append("Connectors removed: {}.".format(', '.join(deleted_connector_names)))
 
-        active_connectors = module.params['active_connectors']
-
-        for connector in active_connectors:
+        for name, digest, source in definitions:
+            if digest is not None and digest == hashes.get(name) and name in current_connector_names:
+                unchanged_definitions += 1
+                deployed_hashes[name] = digest
+                if module.params['failed_tasks_retries'] > 0:
+                    # the definition is unchanged, only the failed tasks are recovered
+                    is_running, failures_msg = get_connector_status(
+                        module.params['connect_url'], name, module.params['timeout'], module.params['username'],
+                        module.params['password'], module.params['client_cert'], module.params['client_key'],
+                        EXPECTED_STATES[connector_definitions.load(source).get('state', 'running')],
+                        module.params['failed_tasks_retries'])
+                    if not is_running:
+                        connector_failure = True
+                        added_updated_messages.append(format_output(name, False, failures_msg))
+                        del deployed_hashes[name]
+                continue
+
+            connector = source if digest is None else connector_definitions.load(source)
+            state = connector.get('state', 'running')
             try:
                 _unused = current_connector_names.index(connector['name'])
 
@@ -374,7 +656,9 @@ def run_module():
                     username=module.params['username'],
                     password=module.params['password'],
                     client_cert=module.params['client_cert'],
-                    client_key=module.params['client_key']
+                    client_key=module.params['client_key'],
+                    state=state,
+                    failed_tasks_retries=module.params['failed_tasks_retries']
                 )
             except ValueError:
                 success, changed, message = create_new_connector(
@@ -385,7 +669,9 @@ def run_module():
                     username=module.params['username'],
                     password=module.params['password'],
                     client_cert=module.params['client_cert'],
-                    client_key=module.params['client_key']
+                    client_key=module.params['client_key'],
+                    state=state,
+                    failed_tasks_retries=module.params['failed_tasks_retries']
                 )
 
             if changed:  # one connector changed is enough
@@ -393,12 +679,20 @@ def run_module():
 
             if not success:
                 connector_failure = True
+            elif digest is not None:
+                deployed_hashes[name] = digest
 
             added_updated_messages.append(format_output(connector['name'], success, message))
 
-        output_messages.append("Connectors added or updated: {}.".format(', '.join(added_updated_messages)))
+        if added_updated_messages or not unchanged_definitions:
+            output_messages.append("Connectors added or updated: {}.".format(', '.join(added_updated_messages)))
+        if unchanged_definitions:
+            output_messages.append("Connectors with unchanged definitions: {}.".format(unchanged_definitions))
         result['message'] = " ".join(output_messages)
 
+        if hashes_file is not None:
+            write_hashes(hashes_file, deployed_hashes)
+
         if connector_failure:
             module.fail_json(msg='An error occurred while running the module', **result)
 
@@ -0,0 +1,451 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.91',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: keystore_from_certs
+
+short_description: Builds the keystore and truststore of a host from its PEM certificate, key and CA bundle.
+
+version_added: "7.6.1"
+
+description:
+    - "Parses the signed certificate, the private key and the CA bundle once, completes the certificate chain against
+    the CA bundle and writes the PKCS12 keystore and truststore in-process, where the role otherwise runs a keytool or
+    openssl command per store, per CA certificate and per exported file."
+    - "The keystore holds the key and its chain under keystore_alias, plus the root of the chain as caroot. The
+    truststore holds every certificate of the CA bundle as a trusted entry, caroot when the bundle holds a single
+    certificate and ca.pem, ca1.pem, ... otherwise, the aliases keytool was given before."
+    - "Existing stores are opened with their password and compared by the fingerprints of their entries, they are only
+    rewritten when an entry or a password changed. The exported PEM files are only rewritten when their content
+    changed."
+    - "The stores are written in PKCS12 format, which the JKS keystore type also reads. BCFKS stores are not supported."
+    - "Requires cryptography 45.0 or later on the host. With allow_fallback the module reports supported as false
+    instead of failing when it is missing or older, so the caller can build the stores another way."
+
+options:
+    ca_cert_src:
+        type: path
+        description:
+            - Path on the host of the CA certificate bundle. Mutually exclusive with ca_cert_content
+        required: false
+    ca_cert_content:
+        type: str
+        description:
+            - PEM content of the CA certificate bundle. Mutually exclusive with ca_cert_src
+        required: false
+    cert_src:
+        type: path
+        description:
+            - Path on the host of the signed certificate, optionally followed by intermediate certificates
+        required: false
+    cert_content:
+        type: str
+        description:
+            - PEM content of the signed certificate, optionally followed by intermediate certificates
+        required: false
+    key_src:
+        type: path
+        description:
+            - Path on the host of the private key of the signed certificate
+        required: false
+    key_content:
+        type: str
+        description:
+            - PEM content of the private key of the signed certificate
+        required: false
+    key_password:
+        type: str
+        description:
+            - Password of the private key. Ignored if the key is not encrypted
+        required: false
+        default: ''
+    keystore_path:
+        type: path
+        description:
+            - Path of the keystore to write
+        required: true
+    keystore_storepass:
+        type: str
+        description:
+            - Password of the keystore and of its key entry
+        required: true
+    keystore_alias:
+        type: str
+        description:
+            - Alias of the key entry
+        required: false
+        default: localhost
+    truststore_path:
+        type: path
+        description:
+            - Path of the truststore to write
+        required: true
+    truststore_storepass:
+        type: str
+        description:
+            - Password of the truststore
+        required: true
+    ca_cert_dest:
+        type: path
+        description:
+            - Path to export the CA certificate bundle to
+        required: false
+    cert_dest:
+        type: path
+        description:
+            - Path to export the signed certificate to
+        required: false
+    key_dest:
+        type: path
+        description:
+            - Path to export the unencrypted private key to
+        required: false
+    chain_dest:
+        type: path
+        description:
+            - Path to export the complete certificate chain to, from the signed certificate up to the CA
+        required: false
+    force:
+        type: bool
+        description:
+            - Rewrite the stores even if their entries match
+        required: false
+        default: false
+    allow_fallback:
+        type: bool
+        description:
+            - Exit without changes and with supported set to false when cryptography 45.0 or later is not available,
+              instead of failing
+        required: false
+        default: false
+
+author:
+    - Confluent Inc
+'''
+
+EXAMPLES = '''
+- name: Create Keystore and Truststore from Certs
+  keystore_from_certs:
+    ca_cert_content: "{{ lookup('file', '/tmp/certs/ca.crt') }}"
+    cert_content: "{{ lookup('file', '/tmp/certs/kafka-broker-0-signed.crt') }}"
+    key_content: "{{ lookup('file', '/tmp/certs/kafka-broker-0-key.pem') }}"
+    key_password: key-secret
+    keystore_path: /var/ssl/private/kafka_broker.keystore.jks
+    keystore_storepass: keystore-secret
+    truststore_path: /var/ssl/private/kafka_broker.truststore.jks
+    truststore_storepass: truststore-secret
+    ca_cert_dest: /var/ssl/private/ca.crt
+    cert_dest: /var/ssl/private/kafka_broker.crt
+    key_dest: /var/ssl/private/kafka_broker.key
+    chain_dest: /var/ssl/private/kafka_broker.chain
+'''
+
+RETURN = '''
+message:
+    description: The output message that the module generates
+    type: str
+    returned: always
+keystore_changed:
+    description: Whether the keystore was written, or would be in check mode
+    type: bool
+    returned: always
+truststore_changed:
+    description: Whether the truststore was written, or would be in check mode
+    type: bool
+    returned: always
+exported:
+    description: Exported files that were written, or would be in check mode
+    type: list
+    returned: always
+supported:
+    description: Whether cryptography 45.0 or later was available to build the stores
+    type: bool
+    returned: always
+fingerprint:
+    description: SHA-256 fingerprint of the signed certificate
+    type: str
+    returned: success
+'''
+
+import os
+import tempfile
+import traceback
+
+from ansible.module_utils.basic import AnsibleModule, missing_required_lib
+from ansible.module_utils.common.text.converters import to_bytes
+
+CRYPTOGRAPHY_IMPORT_ERROR = None
+try:
+    from cryptography import x509
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.serialization import pkcs12
+except ImportError:
+    CRYPTOGRAPHY_IMPORT_ERROR = traceback.format_exc()
+__metaclass__ = type
+
+# Same protection keytool applies to PKCS12 stores since Java 12
+PKCS12_KDF_ROUNDS = 10000
+
+
+def fingerprint(certificate):
+    return certificate.fingerprint(hashes.SHA256()).hex()
+
+
+def issued_by(certificate, issuer):
+    if certificate.issuer != issuer.subject:
+        return False
+    try:
+        certificate.verify_directly_issued_by(issuer)
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+    return True
+
+
+def complete_chain(certificates, ca_certificates):
+    """
+    Checks the signed certificate and the intermediates following it are in order and completes the chain with the CA
+    certificate that issued the last of them, like the certificate_complete_chain module did.
+    """
+    for certificate, issuer in zip(certificates, certificates[1:]):
+        if not issued_by(certificate, issuer):
+            raise ValueError('{} is not issued by the certificate following it'.format(certificate.subject.rfc4514_string()))
+    chain = list(certificates)
+    for ca_certificate in ca_certificates:
+        if issued_by(chain[-1], ca_certificate):
+            if fingerprint(ca_certificate) != fingerprint(chain[-1]):
+                chain.append(ca_certificate)
+            return chain
+    raise ValueError('No certificate of the CA bundle issued {}'.format(chain[-1].subject.rfc4514_string()))
+
+
+def truststore_aliases(count):
+    # The aliases keytool was given, from the CA bundle split by awk into ca.pem, ca1.pem, ...
+    if count == 1:
+        return ['caroot']
+    return ['ca{}.pem'.format(index or '') for index in range(count)]
+
+
+def store_encryption(password):
+    return serialization.PrivateFormat.PKCS12.encryption_builder() \
+        .kdf_rounds(PKCS12_KDF_ROUNDS) \
+        .key_cert_algorithm(pkcs12.PBES.PBESv2SHA256AndAES256CBC) \
+        .hmac_hash(hashes.SHA256()) \
+        .build(to_bytes(password))
+
+
+def private_key_der(key):
+    return key.private_bytes(serialization.Encoding.DER, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+
+
+def public_key_der(key):
+    return key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+
+
+def entries_of(certificates):
+    return sorted(((entry.friendly_name or b'').lower(), fingerprint(entry.certificate)) for entry in certificates)
+
+
+def keystore_matches(path, password, key, alias, chain_entries):
+    try:
+        with open(path, 'rb') as store_file:
+            store = pkcs12.load_pkcs12(store_file.read(), to_bytes(password))
+    except (IOError, OSError, ValueError):
+        # Missing, protected by another password or not PKCS12
+        return False
+    if store.key is None or store.cert is None or private_key_der(store.key) != private_key_der(key):
+        return False
+    if (store.cert.friendly_name or b'').lower() != to_bytes(alias).lower():
+        return False
+    return [fingerprint(store.cert.certificate)] + entries_of(store.additional_certs) == chain_entries
+
+
+def truststore_matches(path, password, trusted_entries):
+    try:
+        with open(path, 'rb') as store_file:
+            store = pkcs12.load_pkcs12(store_file.read(), to_bytes(password))
+    except (IOError, OSError, ValueError):
+        return False
+    return store.key is None and store.cert is None and entries_of(store.additional_certs) == trusted_entries
+
+
+def write_file(module, path, content, mode):
+    # Existing files keep their owner and mode, the role sets them once the stores are written
+    existed = os.path.exists(path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.' + os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(content)
+    except (IOError, OSError):
+        os.remove(tmp_path)
+        raise
+    module.atomic_move(tmp_path, path)
+    if not existed:
+        os.chmod(path, mode)
+
+
+def read_file(path):
+    try:
+        with open(path, 'rb') as existing_file:
+            return existing_file.read()
+    except (IOError, OSError):
+        return None
+
+
+def source(module, name):
+    content = module.params[name + '_content']
+    if content is not None:
+        return to_bytes(content)
+    try:
+        with open(module.params[name + '_src'], 'rb') as source_file:
+            return source_file.read()
+    except (IOError, OSError) as e:
+        module.fail_json(msg='Unable to read {}: {}'.format(module.params[name + '_src'], e))
+
+
+def load_certificates(module, name, pem):
+    try:
+        certificates = x509.load_pem_x509_certificates(pem)
+    except ValueError as e:
+        module.fail_json(msg='Unable to parse the {} certificates: {}'.format(name, e))
+    return certificates
+
+
+def load_key(module, pem, password):
+    encrypted = b'ENCRYPTED' in pem
+    try:
+        key = serialization.load_pem_private_key(pem, password=to_bytes(password) if encrypted else None)
+    except (ValueError, TypeError) as e:
+        module.fail_json(msg='Unable to load the private key: {}'.format(e))
+    return key, encrypted
+
+
+def run_module():
+    module_args = dict(
+        ca_cert_src=dict(type='path', required=False),
+        ca_cert_content=dict(type='str', required=False),
+        cert_src=dict(type='path', required=False),
+        cert_content=dict(type='str', required=False),
+        key_src=dict(type='path', required=False),
+        key_content=dict(type='str', required=False, no_log=True),
+        key_password=dict(type='str', required=False, default='', no_log=True),
+        keystore_path=dict(type='path', required=True),
+        keystore_storepass=dict(type='str', required=True, no_log=True),
+        keystore_alias=dict(type='str', required=False, default='localhost'),
+        truststore_path=dict(type='path', required=True),
+        truststore_storepass=dict(type='str', required=True, no_log=True),
+        ca_cert_dest=dict(type='path', required=False),
+        cert_dest=dict(type='path', required=False),
+        key_dest=dict(type='path', required=False),
+        chain_dest=dict(type='path', required=False),
+        force=dict(type='bool', required=False, default=False),
+        allow_fallback=dict(type='bool', required=False, default=False)
+    )
+
+    result = dict(
+        changed=False,
+        message='',
+        keystore_changed=False,
+        truststore_changed=False,
+        exported=[],
+        supported=True
+    )
+
+    pairs = [('ca_cert_src', 'ca_cert_content'), ('cert_src', 'cert_content'), ('key_src', 'key_content')]
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=pairs,
+        required_one_of=pairs,
+        supports_check_mode=True
+    )
+
+    if CRYPTOGRAPHY_IMPORT_ERROR is not None or not hasattr(pkcs12, 'serialize_java_truststore'):
+        if module.params['allow_fallback']:
+            result['supported'] = False
+            result['message'] = missing_required_lib('cryptography >= 45.0')
+            module.exit_json(**result)
+        module.fail_json(msg=missing_required_lib('cryptography >= 45.0'), exception=CRYPTOGRAPHY_IMPORT_ERROR, **result)
+
+    ca_pem = source(module, 'ca_cert')
+    cert_pem = source(module, 'cert')
+    key_pem = source(module, 'key')
+    ca_certificates = load_certificates(module, 'CA', ca_pem)
+    certificates = load_certificates(module, 'signed', cert_pem)
+    key, encrypted = load_key(module, key_pem, module.params['key_password'])
+
+    if public_key_der(key.public_key()) != public_key_der(certificates[0].public_key()):
+        module.fail_json(msg='The private key does not match the signed certificate', **result)
+    try:
+        chain = complete_chain(certificates, ca_certificates)
+    except ValueError as e:
+        module.fail_json(msg='Unable to complete the certificate chain: {}'.format(e), **result)
+    result['fingerprint'] = fingerprint(chain[0])
+
+    alias = module.params['keystore_alias']
+    chain_cas = [pkcs12.PKCS12Certificate(certificate, None) for certificate in chain[1:-1]]
+    if len(chain) > 1:
+        chain_cas.append(pkcs12.PKCS12Certificate(chain[-1], b'caroot'))
+    trusted = [pkcs12.PKCS12Certificate(certificate, to_bytes(name))
+               for name, certificate in zip(truststore_aliases(len(ca_certificates)), ca_certificates)]
+
+    force = module.params['force']
+    chain_entries = [fingerprint(chain[0])] + entries_of(chain_cas)
+    result['keystore_changed'] = force or not keystore_matches(
+        module.params['keystore_path'], module.params['keystore_storepass'], key, alias, chain_entries)
+    trusted_entries = entries_of(trusted)
+    result['truststore_changed'] = force or not truststore_matches(
+        module.params['truststore_path'], module.params['truststore_storepass'], trusted_entries)
+
+    # Unencrypted keys are exported as they were provided
+    if encrypted:
+        key_pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    exports = [
+        (module.params['ca_cert_dest'], ca_pem, 0o644),
+        (module.params['cert_dest'], cert_pem, 0o644),
+        (module.params['key_dest'], key_pem, 0o600),
+        (module.params['chain_dest'], b''.join(certificate.public_bytes(serialization.Encoding.PEM) for certificate in chain), 0o644)
+    ]
+    exports = [(path, content, mode) for path, content, mode in exports if path and read_file(path) != content]
+    result['exported'] = [path for path, content, mode in exports]
+
+    result['changed'] = result['keystore_changed'] or result['truststore_changed'] or bool(exports)
+    if not result['changed']:
+        result['message'] = 'Keystore, truststore and exported certs match {}, nothing to do'.format(result['fingerprint'])
+        module.exit_json(**result)
+    if module.check_mode:
+        result['message'] = 'Would update the keystore, truststore or exported certs'
+        module.exit_json(**result)
+
+    try:
+        if result['keystore_changed']:
+            write_file(module, module.params['keystore_path'], pkcs12.serialize_key_and_certificates(
+                to_bytes(alias), key, chain[0], chain_cas, store_encryption(module.params['keystore_storepass'])), 0o640)
+        if result['truststore_changed']:
+            write_file(module, module.params['truststore_path'], pkcs12.serialize_java_truststore(
+                trusted, store_encryption(module.params['truststore_storepass'])), 0o640)
+        for path, content, mode in exports:
+            write_file(module, path, content, mode)
+    except (IOError, OSError) as e:
+        module.fail_json(msg='An error occurred while writing the stores: {}'.format(e), **result)
+
+    updated = [name for name in ('keystore', 'truststore') if result[name + '_changed']] + result['exported']
+    result['message'] = 'Updated: {}'.format(', '.join(updated))
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+# The request is made by the mds_uri action plugin, this file only holds its documentation
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: mds_uri
+
+short_description: Calls an MDS REST endpoint with a cached bearer token instead of basic auth.
+
+description:
+    - "Takes the arguments of the uri module. url_username and url_password are exchanged for a bearer token
+    through /security/1.0/authenticate on the scheme and host of url, called from the target host."
+    - "The token is cached on the Ansible controller, in the temporary directory of the running ansible-playbook
+    process, and shared by every host and task calling the same MDS as the same user, so each request no longer
+    costs an LDAP bind."
+    - "The cache is read on every call and every attempt of an until loop, so a token about to expire is
+    refreshed before the request. A request answered with 401 authenticates again and is sent once more."
+    - "Every other option is passed unchanged to M(ansible.builtin.uri), see its documentation."
+    - "In check mode no request is made and the task is skipped, like the uri module."
+
+options:
+    url_username:
+        type: str
+        description:
+            - User to authenticate as
+        required: true
+    url_password:
+        type: str
+        description:
+            - Password of the user
+        required: true
+    refresh_margin:
+        type: int
+        description:
+            - A cached token expiring in less than this many seconds is refreshed
+        required: false
+        default: 300
+
+author:
+    - Confluent Ansible Community
+'''
+
+EXAMPLES = '''
+- name: Grant role System Admin
+  confluent.platform.mds_uri:
+    url: "{{mds_bootstrap_server_urls.split(',')[0]}}/security/1.0/principals/User:alice/roles/SystemAdmin"
+    method: POST
+    validate_certs: false
+    url_username: "{{mds_super_user}}"
+    url_password: "{{mds_super_user_password}}"
+    headers:
+      Content-Type: application/json
+    body_format: json
+    body: {"clusters": {"kafka-cluster": "{{kafka_cluster_id}}"}}
+    status_code: 204
+  register: mds_result
+  until: mds_result.status == 204
+  retries: "{{ mds_retries }}"
+  delay: 5
+'''
+
+RETURN = '''
+status:
+    description: HTTP status of the request, -1 when the token could not be fetched. Every other value of
+        M(ansible.builtin.uri) is returned as well
+    type: int
+    returned: always
+'''
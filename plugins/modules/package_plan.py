@@ -0,0 +1,233 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.91',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: package_plan
+
+short_description: Installs every Confluent package a host needs in a single transaction.
+
+version_added: "7.6.1"
+
+description:
+    - "Checks the installed versions of all the packages in one rpm or dpkg query and installs the missing ones with
+    a single dnf/yum or apt-get transaction, instead of one dependency solve per component role."
+    - "Hosts that need an upgrade, a downgrade or the removal of a conflicting package are left to the component
+    roles, which stop the services and remove the old packages first. The plan is then reported as not planned."
+    - "With repo_snapshot the packages are installed from the package files in that directory, without any remote
+    repository."
+
+options:
+    packages:
+        type: list
+        elements: str
+        description:
+            - Names of the packages the host needs, without version
+        required: true
+    version:
+        type: str
+        description:
+            - Version the packages must be installed at, ex. 7.6.1-1. Empty to accept any installed version
+        required: false
+        default: ''
+    conflicts:
+        type: list
+        elements: str
+        description:
+            - Packages that must be removed by the component roles before the others can be installed
+        required: false
+        default: []
+    repo_snapshot:
+        type: path
+        description:
+            - Directory on the host holding the .rpm or .deb files to install from, for offline installs
+        required: false
+
+author:
+    - Confluent Inc
+'''
+
+EXAMPLES = '''
+- name: Install Confluent Packages
+  package_plan:
+    packages:
+      - confluent-common
+      - confluent-server
+    version: 7.6.1-1
+'''
+
+RETURN = '''
+message:
+    description: The output message that the module generates
+    type: str
+    returned: always
+planned:
+    description: Whether the packages were handled by the plan. When false the component roles install them
+    type: bool
+    returned: always
+installed:
+    description: Packages installed by this run, or that would be in check mode
+    type: list
+    returned: always
+'''
+
+import glob
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+__metaclass__ = type
+
+
+def package_manager(module):
+    for name in ('dnf', 'yum', 'apt-get'):
+        path = module.get_bin_path(name)
+        if path:
+            return name, path
+    module.fail_json(msg='None of dnf, yum or apt-get could be found')
+
+
+def installed_versions(module, manager, packages):
+    # A single query for all packages. The ones that are not installed are reported as "package X is not installed"
+    # on stdout by rpm and on stderr by dpkg-query, only lines in the query format are kept
+    if manager == 'apt-get':
+        command = [module.get_bin_path('dpkg-query', required=True), '-W', '-f=${Package} ${Version} ${db:Status-Abbrev}\\n']
+    else:
+        command = [module.get_bin_path('rpm', required=True), '-q', '--qf', '%{NAME} %{VERSION}-%{RELEASE} ii\\n']
+    rc, stdout, stderr = module.run_command(command + list(packages))
+
+    versions = {}
+    for line in stdout.splitlines():
+        fields = line.split()
+        if len(fields) == 3 and fields[2].startswith('ii'):
+            versions[fields[0]] = fields[1]
+    return versions
+
+
+def version_matches(installed, version):
+    if not version:
+        return True
+    # Debian versions may be prefixed with an epoch
+    installed = installed.split(':', 1)[-1]
+    return installed == version or installed.startswith(version + '-')
+
+
+def package_file_name(manager, path):
+    # name_version_arch.deb or name-version-release.arch.rpm, package names may contain dashes but not underscores
+    file_name = os.path.basename(path)
+    if manager == 'apt-get':
+        return file_name.split('_', 1)[0]
+    return file_name.rsplit('-', 2)[0]
+
+
+def snapshot_files(module, manager, packages, version, repo_snapshot):
+    files = []
+    for package in packages:
+        if manager == 'apt-get':
+            pattern = '{}_{}*.deb'.format(package, version)
+        else:
+            pattern = '{}-{}*.rpm'.format(package, version)
+        # Without a version confluent-server-* also matches confluent-server-rest-*
+        matches = sorted(path for path in glob.glob(os.path.join(repo_snapshot, pattern))
+                         if package_file_name(manager, path) == package)
+        if not matches:
+            module.fail_json(msg='No package file for {} in {}'.format(package, repo_snapshot))
+        files.append(matches[-1])
+    return files
+
+
+def install_command(module, manager, manager_path, packages, version, repo_snapshot):
+    if repo_snapshot:
+        specs = snapshot_files(module, manager, packages, version, repo_snapshot)
+    elif version:
+        separator = '=' if manager == 'apt-get' else '-'
+        specs = [package + separator + version for package in packages]
+    else:
+        specs = list(packages)
+
+    if manager == 'apt-get':
+        command = [manager_path, 'install', '-y', '-q', '-o', 'Dpkg::Options::=--force-confold']
+        if repo_snapshot:
+            command.append('--no-download')
+    else:
+        command = [manager_path, 'install', '-y', '-q']
+        if repo_snapshot:
+            command.append('--disablerepo=*')
+    return command + specs
+
+
+def run_module():
+    module_args = dict(
+        packages=dict(type='list', elements='str', required=True),
+        version=dict(type='str', required=False, default=''),
+        conflicts=dict(type='list', elements='str', required=False, default=[]),
+        repo_snapshot=dict(type='path', required=False)
+    )
+
+    result = dict(
+        changed=False,
+        message='',
+        planned=False,
+        installed=[]
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    packages = sorted(set(module.params['packages']))
+    version = module.params['version']
+    repo_snapshot = module.params['repo_snapshot']
+    if not packages:
+        result['planned'] = True
+        result['message'] = 'No packages needed'
+        module.exit_json(**result)
+
+    manager, manager_path = package_manager(module)
+    versions = installed_versions(module, manager, packages + sorted(module.params['conflicts']))
+
+    conflicting = [package for package in module.params['conflicts'] if package in versions]
+    outdated = [package for package in packages if package in versions and not version_matches(versions[package], version)]
+    if conflicting or outdated:
+        result['message'] = 'Packages to replace or upgrade, leaving them to the component roles: {}'.format(
+            ', '.join(conflicting + outdated))
+        module.exit_json(**result)
+
+    missing = [package for package in packages if package not in versions]
+    result['planned'] = True
+    if not missing:
+        result['message'] = 'All packages are installed'
+        module.exit_json(**result)
+
+    result['changed'] = True
+    result['installed'] = missing
+    if module.check_mode:
+        result['message'] = 'Would install: {}'.format(', '.join(missing))
+        module.exit_json(**result)
+
+    command = install_command(module, manager, manager_path, missing, version, repo_snapshot)
+    rc, stdout, stderr = module.run_command(command, environ_update={'DEBIAN_FRONTEND': 'noninteractive'})
+    if rc != 0:
+        result['changed'] = False
+        result['installed'] = []
+        module.fail_json(msg='An error occurred while running the module', stdout=stdout, stderr=stderr, **result)
+
+    result['message'] = 'Installed: {}'.format(', '.join(missing))
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+# The variables are compiled and cached by the topology_cache action plugin, this file only holds its documentation
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: topology_cache
+
+short_description: Compiles derived topology variables once and caches them on the controller.
+
+description:
+    - "Templates the given variables, typically the component dicts and protocols the restart and health check tasks
+    read, and stores the result on the Ansible controller, one file per host."
+    - "The cache is keyed on the groups and, for every host, the variables the inventory, its group_vars/host_vars
+    and the extra vars give it, as well as its OS facts and the collection version, so any change to them invalidates
+    it. Hosts yielded by inventory plugins and scripts are part of the key. Variables registered or set with set_fact
+    before the task are part of the key as well."
+    - "Computing the key reads the variables of every host. Run the module once without I(variables) to get the key,
+    then pass it as I(cache_key) to the task loading the variables of each host."
+    - "Later playbooks load the compiled values instead of templating them again. Feed the returned variables to set_fact
+    so they take precedence over the role variables."
+    - "The task fails, listing the variables, when a variable is undefined or fails to template for a host."
+
+options:
+    cache_dir:
+        type: path
+        description:
+            - Directory on the controller holding the cache. Compiled properties contain passwords, files are created with 0600 permissions.
+        required: true
+    variables:
+        type: list
+        elements: str
+        description:
+            - Names of the variables to compile. When empty, only the cache key is computed and returned.
+        default: []
+    cache_key:
+        type: str
+        description:
+            - Cache key returned by an earlier run of the module. Computed from the inventory when omitted.
+    facts:
+        type: list
+        elements: str
+        description:
+            - Facts, without the ansible_ prefix, the compiled variables depend on. Their values on every host are part of the key.
+        default: [os_family, distribution, distribution_major_version, distribution_release]
+
+author:
+    - Confluent Ansible Community
+'''
+
+EXAMPLES = '''
+- name: Compute Topology Cache Key
+  confluent.platform.topology_cache:
+    cache_dir: ~/.ansible/confluent_topology_cache
+  register: topology_cache_key
+  run_once: true
+
+- name: Load Compiled Topology
+  confluent.platform.topology_cache:
+    cache_dir: ~/.ansible/confluent_topology_cache
+    cache_key: "{{ topology_cache_key.cache_key }}"
+    variables:
+      - kafka_broker_final_properties
+  register: compiled_topology
+
+- name: Set Compiled Topology Variables
+  set_fact:
+    "{{ item.key }}": "{{ item.value }}"
+  loop: "{{ compiled_topology.variables | dict2items }}"
+'''
+
+RETURN = '''
+variables:
+    description: The compiled variables, by name
+    type: dict
+    returned: always
+cached:
+    description: Whether the variables were loaded from the cache
+    type: bool
+    returned: always
+cache_key:
+    description: Hash of the inventory variables, facts and collection content the cache entry belongs to
+    type: str
+    returned: always
+'''
@@ -0,0 +1,257 @@
+#!/usr/bin/python
+
+# Copyright: (c) 2024, Confluent Inc
+
+from __future__ import (absolute_import, division, print_function)
+
+ANSIBLE_METADATA = {
+    'metadata_version': '0.91',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = '''
+---
+module: tree_ownership
+
+short_description: Recursively sets the owner and group of a directory tree, skipping trees that did not change.
+
+version_added: "7.6.1"
+
+description:
+    - "Walks the tree with several threads, only stats entries through scandir and only changes the ones whose owner
+    or group differ, where the file module with recurse stats and sets attributes on every entry one by one."
+    - "Once the tree is consistent a stamp holding the owner, the group and the inode and mtime of the top level
+    directory is recorded. Later runs skip the walk while the stamp matches, entries added or removed directly under
+    the top level directory change its mtime and trigger a new walk."
+    - "Symbolic links are changed themselves and never followed."
+
+options:
+    path:
+        type: path
+        description:
+            - Top level directory of the tree
+        required: true
+    owner:
+        type: str
+        description:
+            - Name or uid of the user that should own the tree
+        required: true
+    group:
+        type: str
+        description:
+            - Name or gid of the group that should own the tree
+        required: true
+    force:
+        type: bool
+        description:
+            - Walk the tree even if the stamp matches, ex. when files were just extracted into an existing subdirectory
+        required: false
+        default: false
+    stamp_dir:
+        type: path
+        description:
+            - Directory on the host the stamps are recorded in
+        required: false
+        default: ~/.ansible/confluent_ownership_stamps
+    workers:
+        type: int
+        description:
+            - Number of directories scanned concurrently
+        required: false
+        default: 8
+
+author:
+    - Confluent Inc
+'''
+
+EXAMPLES = '''
+- name: Set Ownership of Data Dir Files
+  tree_ownership:
+    path: /var/lib/zookeeper
+    owner: cp-kafka
+    group: confluent
+'''
+
+RETURN = '''
+message:
+    description: The output message that the module generates
+    type: str
+    returned: always
+skipped_walk:
+    description: Whether the walk was skipped because the stamp matched
+    type: bool
+    returned: always
+scanned:
+    description: Number of entries checked
+    type: int
+    returned: always
+updated:
+    description: Number of entries whose owner or group were changed, or would be in check mode
+    type: int
+    returned: always
+'''
+
+import grp
+import hashlib
+import json
+import os
+import pwd
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from ansible.module_utils.basic import AnsibleModule
+__metaclass__ = type
+
+
+def resolve_id(name, lookup):
+    if name.isdigit():
+        return int(name)
+    return lookup(name)
+
+
+class TreeWalker(object):
+    """
+    Scans directories concurrently and changes the owner/group of the entries that differ.
+    Each scanned directory returns its subdirectories so the caller can schedule them on the pool.
+    """
+
+    def __init__(self, uid, gid, check_mode):
+        self.uid = uid
+        self.gid = gid
+        self.check_mode = check_mode
+        self.scanned = 0
+        self.updated = 0
+        self.lock = threading.Lock()
+
+    def fix(self, path, stat_result):
+        if stat_result.st_uid == self.uid and stat_result.st_gid == self.gid:
+            return 0
+        if not self.check_mode:
+            os.lchown(path, self.uid, self.gid)
+        return 1
+
+    def scan(self, directory):
+        subdirectories = []
+        scanned = updated = 0
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            # Removed by the running service while walking
+            return subdirectories
+        with entries:
+            for entry in entries:
+                try:
+                    updated += self.fix(entry.path, entry.stat(follow_symlinks=False))
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                except FileNotFoundError:
+                    continue
+                scanned += 1
+        with self.lock:
+            self.scanned += scanned
+            self.updated += updated
+        return subdirectories
+
+    def walk(self, path, workers):
+        self.scanned = 1
+        self.updated = self.fix(path, os.lstat(path))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set([executor.submit(self.scan, path)])
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for subdirectory in future.result():
+                        pending.add(executor.submit(self.scan, subdirectory))
+
+
+def stamp_of(path, uid, gid):
+    stat_result = os.stat(path)
+    return {
+        'path': path,
+        'uid': uid,
+        'gid': gid,
+        'device': stat_result.st_dev,
+        'inode': stat_result.st_ino,
+        'mtime_ns': stat_result.st_mtime_ns
+    }
+
+
+def read_stamp(stamp_path):
+    try:
+        with open(stamp_path) as stamp_file:
+            return json.load(stamp_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_stamp(stamp_path, stamp):
+    stamp_dir = os.path.dirname(stamp_path)
+    if not os.path.isdir(stamp_dir):
+        os.makedirs(stamp_dir, 0o700)
+    tmp_path = stamp_path + '.tmp'
+    with open(tmp_path, 'w') as stamp_file:
+        json.dump(stamp, stamp_file)
+    os.rename(tmp_path, stamp_path)
+
+
+def run_module():
+    module_args = dict(
+        path=dict(type='path', required=True),
+        owner=dict(type='str', required=True),
+        group=dict(type='str', required=True),
+        force=dict(type='bool', required=False, default=False),
+        stamp_dir=dict(type='path', required=False, default='~/.ansible/confluent_ownership_stamps'),
+        workers=dict(type='int', required=False, default=8)
+    )
+
+    result = dict(
+        changed=False,
+        message='',
+        skipped_walk=False,
+        scanned=0,
+        updated=0
+    )
+
+    module = AnsibleModule(
+        argument_spec=module_args,
+        supports_check_mode=True
+    )
+
+    path = os.path.realpath(module.params['path'])
+    if not os.path.isdir(path):
+        module.fail_json(msg='{} is not a directory'.format(path), **result)
+
+    try:
+        uid = resolve_id(module.params['owner'], lambda name: pwd.getpwnam(name).pw_uid)
+        gid = resolve_id(module.params['group'], lambda name: grp.getgrnam(name).gr_gid)
+    except KeyError as e:
+        module.fail_json(msg='Unknown owner or group: {}'.format(e), **result)
+
+    stamp_path = os.path.join(module.params['stamp_dir'], '{}.json'.format(hashlib.sha256(path.encode('utf-8')).hexdigest()))
+    if not module.params['force'] and read_stamp(stamp_path) == stamp_of(path, uid, gid):
+        result['skipped_walk'] = True
+        result['message'] = 'Ownership stamp of {} matches, nothing to do'.format(path)
+        module.exit_json(**result)
+
+    walker = TreeWalker(uid, gid, module.check_mode)
+    try:
+        walker.walk(path, max(module.params['workers'], 1))
+    except OSError as e:
+        module.fail_json(msg='An error occurred while setting ownership of {}: {}'.format(path, e), **result)
+
+    result['scanned'] = walker.scanned
+    result['updated'] = walker.updated
+    result['changed'] = walker.updated > 0
+    if not module.check_mode:
+        write_stamp(stamp_path, stamp_of(path, uid, gid))
+    result['message'] = 'Changed ownership of {} out of {} entries under {}'.format(walker.updated, walker.scanned, path)
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.action.host_preflight import clock_skew
+
+
+def test_clock_skew_of_a_synchronized_host():
+    # Module sent at 100, result back at 104 after 2s of checks, the clock was read between 100 and 102
+    skew, uncertainty = clock_skew(100.0, 104.0, 2.0, 101.0)
+
+    assert uncertainty == pytest.approx(1.0)
+    assert skew == pytest.approx(0.0)
+
+
+def test_clock_skew_of_a_host_ahead_and_behind():
+    assert clock_skew(100.0, 100.0, 0.0, 160.0)[0] == pytest.approx(60.0)
+    assert clock_skew(100.0, 100.0, 0.0, 55.0)[0] == pytest.approx(-45.0)
+
+
+def test_clock_skew_window_never_ends_before_the_start():
+    # A host reporting more elapsed time than the round trip does not widen the window backwards
+    skew, uncertainty = clock_skew(100.0, 101.0, 5.0, 100.0)
+
+    assert uncertainty == 0
+    assert skew == pytest.approx(0.0)
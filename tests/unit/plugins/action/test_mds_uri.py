@@ -0,0 +1,65 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import time
+
+from ansible_collections.confluent.platform.plugins.action.mds_uri import ActionModule
+
+
+class TokenCache(ActionModule):
+    # Token cache of the action plugin, authenticating against a counter instead of MDS
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.issued = []
+
+    def _cache_path(self, url, username):
+        return self.cache_path
+
+    def _authenticate(self, url, username, password, validate_certs, task_vars):
+        self.issued.append('token-{}'.format(len(self.issued) + 1))
+        return {'token': self.issued[-1], 'expires_at': int(time.time()) + 3600}
+
+    def get_token(self, stale_token=None):
+        return self._get_token('https://mds:8090', 'user', 'secret', True, 300, {}, stale_token=stale_token)
+
+
+def test_read_cache_drops_entries_about_to_expire(tmp_path):
+    path = tmp_path / 'token.json'
+    path.write_text(json.dumps({'token': 't', 'expires_at': time.time() + 200}))
+
+    assert ActionModule._read_cache(str(path), 100)['token'] == 't'
+    assert ActionModule._read_cache(str(path), 300) is None
+
+
+def test_read_cache_of_a_missing_or_corrupt_file(tmp_path):
+    path = tmp_path / 'token.json'
+
+    assert ActionModule._read_cache(str(path), 0) is None
+    path.write_text('{')
+    assert ActionModule._read_cache(str(path), 0) is None
+
+
+def test_token_is_cached_across_calls(tmp_path):
+    cache = TokenCache(str(tmp_path / 'token.json'))
+
+    entry, cached = cache.get_token()
+    assert (entry['token'], cached) == ('token-1', False)
+
+    entry, cached = cache.get_token()
+    assert (entry['token'], cached) == ('token-1', True)
+    assert cache.issued == ['token-1']
+
+
+def test_stale_token_is_replaced_once(tmp_path):
+    cache = TokenCache(str(tmp_path / 'token.json'))
+    stale = cache.get_token()[0]['token']
+
+    # The first fork seeing a 401 authenticates again, the others pick its token up
+    entry, cached = cache.get_token(stale_token=stale)
+    assert (entry['token'], cached) == ('token-2', False)
+
+    entry, cached = cache.get_token(stale_token=stale)
+    assert (entry['token'], cached) == ('token-2', True)
+    assert cache.issued == ['token-1', 'token-2']
@@ -0,0 +1,85 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import copy
+import hashlib
+
+from ansible_collections.confluent.platform.plugins.action.topology_cache import (
+    KEY_FACTS,
+    ActionModule,
+    canonical,
+    inventory_variables,
+)
+
+
+class HostVars(object):
+    # hostvars of the variable manager, by host, with their raw variables
+
+    def __init__(self, hosts):
+        self.hosts = hosts
+
+    def raw_get(self, host):
+        return self.hosts[host]
+
+
+def task_vars_of(hosts, groups):
+    return {'groups': groups, 'hostvars': HostVars(hosts)}
+
+
+def inventory_key(task_vars):
+    digest = hashlib.sha256()
+    ActionModule._hash_inventory(digest, task_vars, KEY_FACTS)
+    return digest.hexdigest()
+
+
+HOSTS = {
+    'b1': {
+        'kafka_broker_custom_properties': {'num.io.threads': 16},
+        'omit': '__omit_place_holder__1234',
+        'inventory_hostname': 'b1',
+        'ansible_facts': {'os_family': 'RedHat', 'date_time': {'epoch': '1'}},
+        'ansible_os_family': 'RedHat',
+        'ansible_date_time': {'epoch': '1'},
+    },
+    'b2': {
+        'kafka_broker_custom_properties': {},
+        'ansible_facts': {'os_family': 'Debian'},
+    },
+}
+GROUPS = {'all': ['b1', 'b2'], 'kafka_broker': ['b1', 'b2']}
+
+
+def test_canonical_orders_keys_of_mixed_types():
+    assert canonical({1: 'a', 'b': [{'c': 2}]}) == [['1', 'a'], ['b', [[['c', 2]]]]]
+
+
+def test_inventory_variables_leave_out_facts_and_magic_variables():
+    assert inventory_variables(HOSTS['b1']) == {'kafka_broker_custom_properties': {'num.io.threads': 16}}
+
+
+def test_key_ignores_volatile_variables():
+    hosts = copy.deepcopy(HOSTS)
+    hosts['b1']['omit'] = '__omit_place_holder__5678'
+    hosts['b1']['ansible_facts']['date_time'] = hosts['b1']['ansible_date_time'] = {'epoch': '2'}
+
+    assert inventory_key(task_vars_of(hosts, GROUPS)) == inventory_key(task_vars_of(HOSTS, GROUPS))
+
+
+def test_key_changes_with_inventory_variables():
+    hosts = copy.deepcopy(HOSTS)
+    hosts['b2']['kafka_broker_custom_properties'] = {'num.io.threads': 8}
+
+    assert inventory_key(task_vars_of(hosts, GROUPS)) != inventory_key(task_vars_of(HOSTS, GROUPS))
+
+
+def test_key_changes_with_the_facts_the_variables_use():
+    hosts = copy.deepcopy(HOSTS)
+    hosts['b2']['ansible_facts']['os_family'] = 'RedHat'
+
+    assert inventory_key(task_vars_of(hosts, GROUPS)) != inventory_key(task_vars_of(HOSTS, GROUPS))
+
+
+def test_key_changes_with_group_membership():
+    groups = {'all': ['b1', 'b2'], 'kafka_broker': ['b1'], 'kafka_controller': ['b2']}
+
+    assert inventory_key(task_vars_of(HOSTS, groups)) != inventory_key(task_vars_of(HOSTS, GROUPS))
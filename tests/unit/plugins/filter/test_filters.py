@@ -0,0 +1,54 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible_collections.confluent.platform.plugins.filter.filters import FilterModule
+
+
+def test_connector_names(tmp_path):
+    path = tmp_path / 'connectors.ndjson'
+    path.write_text('\n'.join(json.dumps({'name': name, 'config': {}}) for name in ('a', 'b')) + '\n')
+
+    assert FilterModule().connector_names(str(path)) == ['a', 'b']
+
+
+def test_listener_peers_lists_the_ports_of_the_other_hosts():
+    groups = {'zookeeper': ['zk1', 'zk2'], 'kafka_broker': ['b1', 'b2']}
+    hostvars = {
+        'zk1': {'inventory_hostname': 'zk1', 'zookeeper_client_port': 2182},
+        'zk2': {'inventory_hostname': 'zk2'},
+        'b1': {'inventory_hostname': 'b1'},
+        'b2': {'inventory_hostname': 'b2', 'kafka_broker_listeners': {
+            'internal': {'port': 9091}, 'broker': {'port': 9092}, 'unset': {}
+        }},
+    }
+    listener_ports = {
+        'zookeeper': {'zookeeper_client_port': 2181},
+        'kafka_broker': {'kafka_broker_listeners': {'internal': {'port': 9091}}},
+    }
+    peer_groups = {'kafka_broker': ['zookeeper', 'kafka_broker']}
+
+    peers = FilterModule().listener_peers(listener_ports, peer_groups, ['kafka_broker'], groups, hostvars, 'b1')
+
+    assert sorted((peer['host'], peer['port']) for peer in peers) == [
+        ('b2', 9091), ('b2', 9092), ('zk1', 2182), ('zk2', 2181)
+    ]
+    assert all(peer['address'] == peer['host'] for peer in peers)
+
+
+def test_listener_peers_quorum_ports_only_apply_within_the_group():
+    groups = {'zookeeper': ['zk1', 'zk2'], 'kafka_broker': ['b1']}
+    hostvars = dict((host, {'inventory_hostname': host}) for host in ('zk1', 'zk2', 'b1'))
+    listener_ports = {'zookeeper': {'zookeeper_client_port': 2181}}
+    peer_groups = {'kafka_broker': ['zookeeper']}
+    quorum_ports = {'zookeeper': {'zookeeper_peer_port': 2888}}
+    filters = FilterModule()
+
+    zookeeper_peers = filters.listener_peers(listener_ports, peer_groups, ['zookeeper'], groups, hostvars, 'zk1',
+                                             quorum_ports)
+    broker_peers = filters.listener_peers(listener_ports, peer_groups, ['kafka_broker'], groups, hostvars, 'b1',
+                                          quorum_ports)
+
+    assert [(peer['host'], peer['port']) for peer in zookeeper_peers] == [('zk2', 2888)]
+    assert sorted((peer['host'], peer['port']) for peer in broker_peers) == [('zk1', 2181), ('zk2', 2181)]
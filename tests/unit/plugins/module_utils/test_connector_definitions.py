@@ -0,0 +1,67 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.module_utils.connector_definitions import (
+    DefinitionError,
+    definition_digest,
+    load,
+    names,
+    scan,
+)
+
+
+def definition(name, **fields):
+    return dict({'name': name, 'config': {'connector.class': 'FileStreamSource'}}, **fields)
+
+
+def test_scan_ndjson_yields_each_line_with_its_offset(tmp_path):
+    path = tmp_path / 'connectors.ndjson'
+    lines = [json.dumps(definition('a')), '', json.dumps(definition('b', state='paused'))]
+    path.write_text('\n'.join(lines) + '\n')
+
+    scanned = list(scan(str(path)))
+
+    assert [name for name, digest, location in scanned] == ['a', 'b']
+    assert scanned[0][2] == (str(path), 0)
+    assert load(scanned[1][2]) == definition('b', state='paused')
+
+
+def test_scan_directory_reads_json_files_in_order(tmp_path):
+    (tmp_path / '2.json').write_text(json.dumps(definition('second')))
+    (tmp_path / '1.json').write_text(json.dumps(definition('first')))
+    (tmp_path / 'notes.txt').write_text('not a definition')
+
+    assert names(str(tmp_path)) == ['first', 'second']
+    assert list(scan(str(tmp_path)))[0][2] == (str(tmp_path / '1.json'), None)
+
+
+def test_digest_is_the_same_in_both_layouts(tmp_path):
+    raw = json.dumps(definition('a'))
+    (tmp_path / 'connectors.ndjson').write_text(raw + '\n')
+    (tmp_path / 'dir').mkdir()
+    (tmp_path / 'dir' / 'a.json').write_text(raw)
+
+    ndjson_digest = list(scan(str(tmp_path / 'connectors.ndjson')))[0][1]
+    directory_digest = list(scan(str(tmp_path / 'dir')))[0][1]
+
+    assert ndjson_digest == directory_digest == definition_digest(raw.encode('utf-8'))
+
+
+def test_scan_reports_the_line_of_an_invalid_definition(tmp_path):
+    path = tmp_path / 'connectors.ndjson'
+    path.write_text(json.dumps(definition('a')) + '\n{"name": "b"}\n')
+
+    with pytest.raises(DefinitionError, match='connectors.ndjson:2'):
+        list(scan(str(path)))
+
+
+def test_scan_rejects_unknown_states(tmp_path):
+    path = tmp_path / 'connectors.ndjson'
+    path.write_text(json.dumps(definition('a', state='stopped')) + '\n')
+
+    with pytest.raises(DefinitionError, match='state must be one of'):
+        list(scan(str(path)))
@@ -0,0 +1,76 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.module_utils import metrics
+from ansible_collections.confluent.platform.plugins.module_utils.metrics import Metrics, read_spool, spool_record
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(metrics.SPOOL_DIR_ENV, str(tmp_path))
+    monkeypatch.setattr(metrics, '_spool_buffer', {})
+    monkeypatch.setattr(metrics, '_spool_pid', None)
+    return tmp_path
+
+
+def test_record_accumulates_calls_and_keeps_the_max():
+    host_metrics = Metrics()
+    host_metrics.record('http', 'GET /connectors', 0.5, bytes_sent=10, bytes_received=100)
+    host_metrics.record('http', 'GET /connectors', 1.5, retries=2)
+    host_metrics.retry('http', 'GET /connectors')
+
+    assert host_metrics.as_dict()['http']['GET /connectors'] == {
+        'calls': 2,
+        'total_seconds': 2.0,
+        'max_seconds': 1.5,
+        'bytes_sent': 10,
+        'bytes_received': 100,
+        'retries': 3,
+    }
+
+
+def test_merge_adds_other_metrics():
+    first = Metrics()
+    first.record('filter', 'kafka_protocol', 0.25)
+    second = Metrics()
+    second.record('filter', 'kafka_protocol', 0.5)
+    second.record('filter', 'resolve_hostname', 0.125)
+
+    first.merge(second.as_dict())
+
+    assert first.as_dict()['filter']['kafka_protocol']['calls'] == 2
+    assert first.as_dict()['filter']['kafka_protocol']['max_seconds'] == 0.5
+    assert first.as_dict()['filter']['resolve_hostname']['total_seconds'] == 0.125
+
+
+def test_spooled_timings_are_read_back_per_host(spool_dir):
+    spool_record('b1', 'filter', 'kafka_protocol', 0.25)
+    spool_record('b2', 'filter', 'kafka_protocol', 0.5)
+    spool_record('b1', 'filter', 'kafka_protocol', 0.25)
+
+    host_metrics, unflushed = read_spool(str(spool_dir))
+
+    assert unflushed == 0
+    assert host_metrics['b1'].as_dict()['filter']['kafka_protocol']['calls'] == 2
+    assert host_metrics['b2'].as_dict()['filter']['kafka_protocol']['total_seconds'] == 0.5
+    assert not os.path.exists(metrics._pending_path(str(spool_dir), os.getpid()))
+
+
+def test_read_spool_counts_processes_that_did_not_flush(spool_dir):
+    (spool_dir / '123.pending').write_text('')
+    (spool_dir / '124.ndjson').write_text(
+        json.dumps({'host': 'b1', 'metrics': {'filter': {'kafka_protocol': {'calls': 3}}}}) + '\ntruncated line\n')
+
+    host_metrics, unflushed = read_spool(str(spool_dir))
+
+    assert unflushed == 1
+    assert host_metrics['b1'].as_dict()['filter']['kafka_protocol']['calls'] == 3
+
+
+def test_read_spool_of_a_missing_directory(tmp_path):
+    assert read_spool(str(tmp_path / 'missing')) == ({}, 0)
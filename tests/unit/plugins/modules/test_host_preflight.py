@@ -0,0 +1,51 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.modules.host_preflight import (
+    check_disk,
+    existing_parent,
+    os_family,
+)
+
+
+class FakeModule(object):
+
+    def __init__(self, **params):
+        self.params = params
+
+
+@pytest.mark.parametrize('release, family', [
+    ({'ID': 'ubuntu', 'ID_LIKE': 'debian'}, 'Ubuntu'),
+    ({'ID': 'debian'}, 'Debian'),
+    ({'ID': 'rhel', 'ID_LIKE': 'fedora'}, 'RedHat'),
+    ({'ID': 'rocky', 'ID_LIKE': 'rhel centos fedora'}, 'RedHat'),
+    ({'ID': 'amzn', 'ID_LIKE': 'centos rhel fedora'}, 'RedHat'),
+    ({'ID': 'sles', 'ID_LIKE': 'suse'}, None),
+    ({}, None),
+])
+def test_os_family(release, family):
+    assert os_family(release) == family
+
+
+def test_existing_parent(tmp_path):
+    assert existing_parent(str(tmp_path / 'a' / 'b')) == str(tmp_path)
+
+
+def test_check_disk_passes_with_enough_space(tmp_path):
+    module = FakeModule(required_disk_mb=0, disk_paths=[str(tmp_path / 'data'), str(tmp_path / 'logs')])
+
+    ok, msg = check_disk(module)
+
+    assert ok
+    assert msg.startswith('At least 0MB free on ')
+
+
+def test_check_disk_reports_each_device_once(tmp_path):
+    module = FakeModule(required_disk_mb=2 ** 40, disk_paths=[str(tmp_path / 'data'), str(tmp_path / 'logs')])
+
+    ok, msg = check_disk(module)
+
+    assert not ok
+    assert msg.count(str(tmp_path)) == 1
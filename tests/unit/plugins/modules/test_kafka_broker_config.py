@@ -0,0 +1,72 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.modules.kafka_broker_config import (
+    DYNAMIC_KEYS,
+    classify,
+    dynamic_updates,
+    is_dynamic,
+    read_properties,
+    synonym_value,
+)
+
+
+def test_classify_splits_dynamic_and_static_changes():
+    current = {'broker.id': '1', 'log.retention.ms': '1000', 'num.io.threads': '8', 'log.dirs': '/a'}
+    desired = {'broker.id': '1', 'log.retention.ms': '2000', 'log.dirs': '/b'}
+
+    assert classify(current, desired, DYNAMIC_KEYS) == (['log.retention.ms'], ['num.io.threads'], ['log.dirs'])
+
+
+def test_classify_ignores_unchanged_properties():
+    properties = {'broker.id': '1', 'log.dirs': '/a'}
+
+    assert classify(properties, dict(properties), DYNAMIC_KEYS) == ([], [], [])
+
+
+def test_is_dynamic_matches_listener_ssl_and_jaas_configs():
+    assert is_dynamic('listener.name.internal.ssl.keystore.location', DYNAMIC_KEYS)
+    assert is_dynamic('listener.name.internal.plain.sasl.jaas.config', DYNAMIC_KEYS)
+    assert not is_dynamic('listener.name.internal.ssl.client.auth', DYNAMIC_KEYS)
+    assert is_dynamic('log.retention.hours', DYNAMIC_KEYS)
+    assert is_dynamic('custom.key', DYNAMIC_KEYS | frozenset(['custom.key']))
+
+
+def test_synonym_value_prefers_the_most_precise_form():
+    assert synonym_value('log.retention.ms', {'log.retention.hours': '2'}) == '7200000'
+    assert synonym_value('log.retention.ms', {'log.retention.hours': '2', 'log.retention.minutes': '5'}) == '300000'
+    assert synonym_value('log.retention.ms', {}) is None
+
+
+def test_synonym_value_clamps_negative_durations():
+    assert synonym_value('log.retention.ms', {'log.retention.hours': '-5'}) == '-1'
+
+
+def test_dynamic_updates_maps_synonyms_to_the_ms_form():
+    desired = {'log.retention.hours': '1', 'num.io.threads': '16'}
+
+    assert dynamic_updates(['log.retention.hours', 'num.io.threads'], desired) == {
+        'log.retention.ms': '3600000',
+        'num.io.threads': '16',
+    }
+
+
+def test_dynamic_updates_ms_form_takes_precedence():
+    desired = {'log.retention.hours': '1', 'log.retention.ms': '5000'}
+
+    assert dynamic_updates(['log.retention.hours'], desired) == {}
+    assert dynamic_updates(['log.retention.hours', 'log.retention.ms'], desired) == {'log.retention.ms': '5000'}
+
+
+def test_dynamic_updates_rejects_non_numeric_synonyms():
+    with pytest.raises(ValueError):
+        dynamic_updates(['log.roll.hours'], {'log.roll.hours': 'a day'})
+
+
+def test_read_properties_skips_comments_and_keeps_equal_signs(tmp_path):
+    path = tmp_path / 'server.properties'
+    path.write_text('# comment\n\nbroker.id=1\nlistener.name.a.plain.sasl.jaas.config=x="y";\n')
+
+    assert read_properties(str(path)) == {'broker.id': '1', 'listener.name.a.plain.sasl.jaas.config': 'x="y";'}
@@ -0,0 +1,149 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+import pytest
+
+import ansible.module_utils.six.moves.urllib.error as urllib_error
+from ansible_collections.confluent.platform.plugins.modules import kafka_connectors
+from ansible_collections.confluent.platform.plugins.modules.kafka_connectors import (
+    endpoint_name,
+    get_connector_status,
+    restart_failed,
+    set_connector_state,
+    truncate_error_message,
+)
+
+CONNECT_URL = 'http://connect:8083/connectors'
+
+
+class FakeResponse(object):
+
+    def __init__(self, code, body):
+        self.code = code
+        self.body = body
+
+    def getcode(self):
+        return self.code
+
+    def read(self):
+        return self.body
+
+
+class FakeConnect(object):
+    """
+    Answers Connect REST calls from a script, one list of responses per method and url, the last one repeating.
+    A response is a status code, with a dict to return as body, or an HTTP error code to raise.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.calls = []
+
+    def __call__(self, url, method='GET', data=None, **kwargs):
+        self.calls.append((method, url))
+        responses = self.script[(method, url)]
+        code, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        if code >= 400:
+            raise urllib_error.HTTPError(url, code, 'error {}'.format(code), {}, None)
+        return FakeResponse(code, json.dumps(body).encode('utf-8'))
+
+
+def status(connector_state, *task_states):
+    return 200, {
+        'connector': {'state': connector_state},
+        'tasks': [{'id': task_id, 'state': state, 'trace': '{} trace\nat line'.format(state)}
+                  for task_id, state in enumerate(task_states)]
+    }
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    monkeypatch.setattr(kafka_connectors.time, 'sleep', lambda seconds: None)
+
+    def install(script):
+        fake = FakeConnect(script)
+        monkeypatch.setattr(kafka_connectors, 'open_url', fake)
+        return fake
+    return install
+
+
+def get_status(**kwargs):
+    return get_connector_status(CONNECT_URL, 'c', 10, None, None, None, None, **kwargs)
+
+
+STATUS = ('GET', CONNECT_URL + '/c/status')
+RESTART = ('POST', CONNECT_URL + '/c/restart?includeTasks=true&onlyFailed=true')
+
+
+def test_endpoint_name():
+    assert endpoint_name('GET', CONNECT_URL) == 'GET /connectors'
+    assert endpoint_name('GET', CONNECT_URL + '/c') == 'GET /connectors/<name>'
+    assert endpoint_name('POST', RESTART[1]) == 'POST /connectors/<name>/restart'
+
+
+def test_truncate_error_message():
+    assert truncate_error_message('first line\nsecond line') == 'first line'
+    assert len(truncate_error_message('x' * 500)) == 200
+
+
+def test_connector_without_tasks_is_running(connect):
+    connect({STATUS: [status('RUNNING')]})
+
+    assert get_status() == (True, None)
+
+
+def test_status_is_polled_until_paused(connect):
+    fake = connect({STATUS: [status('RUNNING', 'RUNNING'), status('PAUSED', 'PAUSED')]})
+
+    assert get_status(expected_state='PAUSED') == (True, None)
+    assert len(fake.calls) == 2
+
+
+def test_failed_task_is_reported(connect):
+    connect({STATUS: [status('RUNNING', 'RUNNING', 'FAILED')]})
+
+    assert get_status() == (False, 'task 1: FAILED trace')
+
+
+def test_failed_task_is_restarted(connect):
+    fake = connect({
+        STATUS: [status('RUNNING', 'FAILED'), status('RUNNING', 'RUNNING')],
+        RESTART: [(202, {})],
+    })
+
+    assert get_status(failed_tasks_retries=1) == (True, None)
+    assert RESTART in fake.calls
+
+
+def test_restart_conflict_succeeds_once_nothing_failed(connect):
+    fake = connect({
+        RESTART: [(409, None)],
+        STATUS: [status('RUNNING', 'FAILED'), status('RUNNING', 'RUNNING')],
+    })
+
+    assert restart_failed(CONNECT_URL, 'c', 10, None, None, None, None) == (True, None)
+    assert fake.calls == [RESTART, STATUS, RESTART, STATUS]
+
+
+def test_restart_error_is_reported(connect):
+    connect({RESTART: [(500, None)]})
+
+    success, message = restart_failed(CONNECT_URL, 'c', 10, None, None, None, None)
+
+    assert not success
+    assert message.startswith('failed to restart the failed tasks')
+
+
+def test_set_connector_state_pauses_a_running_connector(connect):
+    fake = connect({STATUS: [status('RUNNING', 'RUNNING')], ('PUT', CONNECT_URL + '/c/pause'): [(202, {})]})
+
+    assert set_connector_state(CONNECT_URL, 'c', 'paused', 10, None, None, None, None) == (True, True, 'connector paused')
+    assert fake.calls[-1] == ('PUT', CONNECT_URL + '/c/pause')
+
+
+def test_set_connector_state_leaves_a_connector_in_its_state(connect):
+    connect({STATUS: [status('PAUSED')]})
+
+    assert set_connector_state(CONNECT_URL, 'c', 'paused', 10, None, None, None, None) == (True, False, None)
@@ -0,0 +1,95 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import datetime
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.modules.keystore_from_certs import (
+    CRYPTOGRAPHY_IMPORT_ERROR,
+    complete_chain,
+    fingerprint,
+    keystore_matches,
+    store_encryption,
+    truststore_aliases,
+    truststore_matches,
+)
+
+try:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.serialization import pkcs12
+    from cryptography.x509.oid import NameOID
+except ImportError:
+    pass
+
+pytestmark = pytest.mark.skipif(CRYPTOGRAPHY_IMPORT_ERROR is not None, reason='cryptography is not installed')
+
+
+def issue(common_name, issuer=None, issuer_key=None, ca=False):
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = x509.CertificateBuilder() \
+        .subject_name(subject) \
+        .issuer_name(issuer.subject if issuer else subject) \
+        .public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()) \
+        .not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)) \
+        .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True) \
+        .sign(issuer_key or key, hashes.SHA256())
+    return certificate, key
+
+
+@pytest.fixture(scope='module')
+def pki():
+    root, root_key = issue('root', ca=True)
+    intermediate, intermediate_key = issue('intermediate', root, root_key, ca=True)
+    leaf, leaf_key = issue('kafka-broker-0', intermediate, intermediate_key)
+    other_root = issue('other root', ca=True)[0]
+    return dict(root=root, intermediate=intermediate, leaf=leaf, leaf_key=leaf_key, other_root=other_root)
+
+
+def test_truststore_aliases():
+    assert truststore_aliases(1) == ['caroot']
+    assert truststore_aliases(3) == ['ca.pem', 'ca1.pem', 'ca2.pem']
+
+
+def test_complete_chain_appends_the_issuing_ca(pki):
+    chain = complete_chain([pki['leaf'], pki['intermediate']], [pki['other_root'], pki['root']])
+
+    assert chain == [pki['leaf'], pki['intermediate'], pki['root']]
+
+
+def test_complete_chain_does_not_repeat_a_self_signed_certificate(pki):
+    assert complete_chain([pki['root']], [pki['root']]) == [pki['root']]
+
+
+def test_complete_chain_rejects_unordered_or_foreign_chains(pki):
+    with pytest.raises(ValueError, match='is not issued by the certificate following it'):
+        complete_chain([pki['intermediate'], pki['leaf']], [pki['root']])
+    with pytest.raises(ValueError, match='No certificate of the CA bundle issued'):
+        complete_chain([pki['leaf'], pki['intermediate']], [pki['other_root']])
+
+
+def test_keystore_matches_the_store_it_was_written_as(pki, tmp_path):
+    path = tmp_path / 'keystore.p12'
+    path.write_bytes(pkcs12.serialize_key_and_certificates(
+        b'kafka-broker-0', pki['leaf_key'], pki['leaf'], [pki['intermediate']], store_encryption('secret')))
+    chain_entries = [fingerprint(pki['leaf']), (b'', fingerprint(pki['intermediate']))]
+
+    assert keystore_matches(str(path), 'secret', pki['leaf_key'], 'KAFKA-BROKER-0', chain_entries)
+    assert not keystore_matches(str(path), 'secret', pki['leaf_key'], 'other', chain_entries)
+    assert not keystore_matches(str(path), 'wrong', pki['leaf_key'], 'kafka-broker-0', chain_entries)
+    assert not keystore_matches(str(tmp_path / 'missing.p12'), 'secret', pki['leaf_key'], 'kafka-broker-0', chain_entries)
+
+
+def test_truststore_matches_its_entries(pki, tmp_path):
+    path = tmp_path / 'truststore.p12'
+    trusted = [pkcs12.PKCS12Certificate(pki['root'], b'caroot')]
+    path.write_bytes(pkcs12.serialize_key_and_certificates(None, None, None, trusted, store_encryption('secret')))
+
+    assert truststore_matches(str(path), 'secret', [(b'caroot', fingerprint(pki['root']))])
+    assert not truststore_matches(str(path), 'secret', [(b'caroot', fingerprint(pki['other_root']))])
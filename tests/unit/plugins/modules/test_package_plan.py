@@ -0,0 +1,85 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.modules.package_plan import (
+    install_command,
+    installed_versions,
+    package_file_name,
+    snapshot_files,
+    version_matches,
+)
+
+
+class FailJson(Exception):
+    pass
+
+
+class FakeModule(object):
+
+    def __init__(self, stdout=''):
+        self.stdout = stdout
+        self.commands = []
+
+    def get_bin_path(self, name, required=False):
+        return '/usr/bin/' + name
+
+    def run_command(self, command):
+        self.commands.append(command)
+        return 0, self.stdout, ''
+
+    def fail_json(self, **kwargs):
+        raise FailJson(kwargs['msg'])
+
+
+@pytest.mark.parametrize('installed, version, matches', [
+    ('7.6.1-1', '7.6.1', True),
+    ('7.6.1', '7.6.1', True),
+    ('1:7.6.1-1', '7.6.1', True),
+    ('7.6.10-1', '7.6.1', False),
+    ('7.5.0-1', '', True),
+])
+def test_version_matches(installed, version, matches):
+    assert version_matches(installed, version) is matches
+
+
+@pytest.mark.parametrize('manager, path, name', [
+    ('dnf', '/repo/confluent-server-7.6.1-1.noarch.rpm', 'confluent-server'),
+    ('dnf', '/repo/confluent-server-rest-7.6.1-1.noarch.rpm', 'confluent-server-rest'),
+    ('apt-get', '/repo/confluent-server_7.6.1-1_all.deb', 'confluent-server'),
+])
+def test_package_file_name(manager, path, name):
+    assert package_file_name(manager, path) == name
+
+
+def test_installed_versions_keeps_installed_packages_only():
+    module = FakeModule(stdout='confluent-server 7.6.1-1 ii\nconfluent-rest 7.6.1-1 rc\n')
+
+    assert installed_versions(module, 'apt-get', ['confluent-server', 'confluent-rest', 'absent']) == {
+        'confluent-server': '7.6.1-1'
+    }
+    assert module.commands[0][-3:] == ['confluent-server', 'confluent-rest', 'absent']
+
+
+def test_install_command_pins_the_version():
+    module = FakeModule()
+
+    assert install_command(module, 'dnf', '/usr/bin/dnf', ['a', 'b'], '7.6.1', '') == [
+        '/usr/bin/dnf', 'install', '-y', '-q', 'a-7.6.1', 'b-7.6.1'
+    ]
+    assert install_command(module, 'apt-get', '/usr/bin/apt-get', ['a'], '7.6.1', '')[-1] == 'a=7.6.1'
+
+
+def test_snapshot_files_pick_the_latest_file_of_each_package(tmp_path):
+    for name in ('confluent-server-7.6.1-1.noarch.rpm', 'confluent-server-7.6.1-2.noarch.rpm',
+                 'confluent-server-rest-7.6.1-3.noarch.rpm'):
+        (tmp_path / name).write_text('')
+    module = FakeModule()
+
+    assert snapshot_files(module, 'dnf', ['confluent-server'], '', str(tmp_path)) == [
+        str(tmp_path / 'confluent-server-7.6.1-2.noarch.rpm')
+    ]
+    with pytest.raises(FailJson, match='No package file for confluent-kafka'):
+        snapshot_files(module, 'dnf', ['confluent-kafka'], '', str(tmp_path))
+    assert install_command(module, 'dnf', '/usr/bin/dnf', ['confluent-server'], '', str(tmp_path))[4] == '--disablerepo=*'
@@ -0,0 +1,61 @@
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+
+import pytest
+
+from ansible_collections.confluent.platform.plugins.modules.tree_ownership import (
+    TreeWalker,
+    read_stamp,
+    resolve_id,
+    stamp_of,
+    write_stamp,
+)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    (tmp_path / 'a' / 'b' / 'segment.log').write_text('')
+    (tmp_path / 'meta.properties').write_text('')
+    (tmp_path / 'link').symlink_to(tmp_path / 'a')
+    return tmp_path
+
+
+def test_resolve_id():
+    assert resolve_id('1000', None) == 1000
+    assert resolve_id('kafka', {'kafka': 995}.get) == 995
+
+
+def test_walk_of_an_owned_tree_changes_nothing(tree):
+    walker = TreeWalker(os.getuid(), os.getgid(), check_mode=True)
+
+    walker.walk(str(tree), workers=4)
+
+    # The root, two directories, two files and the symlink, which is not followed
+    assert (walker.scanned, walker.updated) == (6, 0)
+
+
+def test_walk_counts_entries_to_update_in_check_mode(tree):
+    walker = TreeWalker(os.getuid() + 1, os.getgid(), check_mode=True)
+
+    walker.walk(str(tree), workers=4)
+
+    assert (walker.scanned, walker.updated) == (6, 6)
+    assert os.lstat(str(tree / 'meta.properties')).st_uid == os.getuid()
+
+
+def test_stamp_round_trip_and_invalidation(tmp_path):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    stamp_path = str(tmp_path / 'stamps' / 'data.json')
+    stamp = stamp_of(str(data_dir), 995, 995)
+
+    assert read_stamp(stamp_path) is None
+    write_stamp(stamp_path, stamp)
+    assert read_stamp(stamp_path) == stamp
+
+    # A new top level entry changes the mtime of the directory
+    os.utime(str(data_dir), ns=(stamp['mtime_ns'], stamp['mtime_ns'] + 10 ** 9))
+    assert stamp_of(str(data_dir), 995, 995) != stamp